@@ -0,0 +1,94 @@
+"""
+Shared helpers for the scripts in this directory.
+
+Benchmarks never touch the project's db.sqlite3: each run works on a
+scratch database selected through the TODO_DB_PATH environment variable.
+"""
+
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path, settings="todo.settings"):
+    """Configure Django in this process against the database at ``db_path``."""
+    os.environ["TODO_DB_PATH"] = str(db_path)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings)
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    import django
+
+    django.setup()
+
+
+def scratch_db(name="bench.sqlite3"):
+    """Path of a database file in a fresh temporary directory."""
+    return Path(tempfile.mkdtemp(prefix="todo-bench-")) / name
+
+
+def migrate_and_seed(count, priority_every=10, complete_every=3, title="Task {}".format):
+    """
+    Create the schema and ``count`` tasks in the configured database;
+    ``title(i)`` names the i-th task.
+    """
+    from django.core.management import call_command
+
+    from tasks.models import Task
+
+    call_command("migrate", verbosity=0)
+    Task.objects.bulk_create(
+        (
+            Task(
+                title=title(i),
+                priority=i % priority_every == 0,
+                complete=i % complete_every == 0,
+            )
+            for i in range(count)
+        ),
+        batch_size=5000,
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(command, port, env=None, timeout=30):
+    """Run a server ``command`` until the block exits; wait until it answers."""
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"server did not start: {' '.join(command)}")
+                time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
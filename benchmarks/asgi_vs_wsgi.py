@@ -0,0 +1,108 @@
+"""
+Concurrent-request throughput of the task pages under ASGI and WSGI.
+
+Both servers run the same project against the same seeded scratch
+database: WSGI through ``todo.wsgi`` (threaded ``runserver``), ASGI through
+``todo.asgi`` served by uvicorn, which routes to ``tasks.async_views``.
+Each client thread keeps one connection open and issues GET requests to
+the home page (served from the fragment cache after the first hit) and
+to update pages (one async ORM query each).
+
+Usage:
+    python benchmarks/asgi_vs_wsgi.py --tasks 2000 --requests 2000 --concurrency 32
+"""
+
+import argparse
+import http.client
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from _support import (
+    free_port,
+    migrate_and_seed,
+    percentile,
+    scratch_db,
+    serve,
+    setup_django,
+)
+
+
+def run_client(base_url, paths, count):
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    latencies = []
+    for i in range(count):
+        started = time.perf_counter()
+        connection.request("GET", paths[i % len(paths)])
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{paths[i % len(paths)]} -> {response.status}")
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return latencies
+
+
+def measure(base_url, paths, requests, concurrency):
+    per_client = max(1, requests // concurrency)
+    run_client(base_url, paths, 20)  # warm caches and connections
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        futures = [
+            pool.submit(run_client, base_url, paths, per_client)
+            for _ in range(concurrency)
+        ]
+        latencies = [latency for future in futures for latency in future.result()]
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    db_path = scratch_db()
+    setup_django(db_path)
+    migrate_and_seed(args.tasks)
+
+    from tasks.models import Task
+
+    ids = list(Task.objects.values_list("id", flat=True)[:50])
+    paths = ["/"] + [f"/update_task/{pk}/" for pk in ids]
+    env = {"TODO_DB_PATH": str(db_path)}
+
+    servers = {
+        "wsgi (runserver, threaded)": (
+            [sys.executable, "manage.py", "runserver", "--noreload"],
+            {"TASKS_ASYNC_VIEWS": "0"},
+        ),
+        "asgi (uvicorn, async views)": (
+            [sys.executable, "-m", "uvicorn", "todo.asgi:application", "--log-level", "warning"],
+            {},
+        ),
+    }
+
+    print(f"{args.tasks} tasks, {args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'server':<30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, (command, extra_env) in servers.items():
+        port = free_port()
+        if "runserver" in command:
+            command = command + [f"127.0.0.1:{port}"]
+        else:
+            command = command + ["--port", str(port)]
+        with serve(command, port, env={**env, **extra_env}) as base_url:
+            rate, latencies = measure(base_url, paths, args.requests, args.concurrency)
+        print(
+            f"{name:<30} {rate:>8.0f} "
+            f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+            f"{percentile(latencies, 0.95) * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Bytes on the wire and CPU cost of response compression.
+
+For each list size, renders the home page with that many tasks on it
+(``TASKS_PAGE_SIZE`` raised to match) and streams the NDJSON export of the
+same tasks, then encodes each body as ``tasks.middleware`` does: gzip
+level 6 and, when the ``brotli`` package is installed, brotli quality 5.
+CPU is the time spent in the encoder per request, best of ``--repeat``.
+
+Usage:
+    python benchmarks/compression.py --sizes 50 500 5000
+"""
+
+import argparse
+import time
+
+from _support import migrate_and_seed, scratch_db, setup_django
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django(scratch_db())
+    migrate_and_seed(max(args.sizes))
+
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import Client
+
+    from tasks.compression import available_encoders, compress, compress_iterator
+
+    client = Client(HTTP_HOST="localhost")
+    print(f"{'tasks':>6} {'body':<7} {'identity':>10} {'coding':<6} {'bytes':>9} {'ratio':>6} {'cpu ms':>7}")
+    for size in args.sizes:
+        settings.TASKS_PAGE_SIZE = size
+        cache.clear()
+        page = client.get("/", HTTP_ACCEPT_ENCODING="identity").content
+        export = list(
+            client.get("/api/tasks/", {"limit": size}, HTTP_ACCEPT_ENCODING="identity").streaming_content
+        )
+        bodies = {
+            "html": (len(page), lambda encoder: compress(encoder(), page)),
+            "ndjson": (
+                sum(len(chunk) for chunk in export),
+                lambda encoder: b"".join(compress_iterator(encoder(), export)),
+            ),
+        }
+        for body, (identity, encode) in bodies.items():
+            for encoder in available_encoders():
+                cpu, encoded = best_of(args.repeat, lambda: encode(encoder))
+                print(
+                    f"{size:>6} {body:<7} {identity:>10} {encoder.coding:<6} "
+                    f"{len(encoded):>9} {identity / len(encoded):>6.1f} {cpu * 1000:>7.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Decode speed and memory of the dataset formats read by ``import_dataset``:
+a JSON array (streamed in chunks), NDJSON and CSV (lines sliced out of a
+memory-mapped file).
+
+The same tasks are written in each format; each one is decoded and
+cleaned (``tasks.datasets``) without touching a database, with
+``tracemalloc`` recording the peak of Python allocations.
+
+Usage:
+    python benchmarks/import_formats.py --rows 500000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from _support import ROOT
+
+sys.path.insert(0, str(ROOT))
+
+from tasks import datasets  # noqa: E402
+
+
+def rows(count):
+    for i in range(count):
+        yield {"title": f"Task {i}, from the dataset", "complete": i % 3 == 0, "priority": i % 10 == 0}
+
+
+def write_files(root, count):
+    paths = {fmt: Path(root, f"tasks.{fmt}") for fmt in datasets.FORMATS}
+    with open(paths["json"], "w", encoding="utf-8") as stream:
+        stream.write("[\n" + ",\n".join(json.dumps(row) for row in rows(count)) + "\n]\n")
+    with open(paths["ndjson"], "w", encoding="utf-8") as stream:
+        stream.writelines(json.dumps(row) + "\n" for row in rows(count))
+    with open(paths["csv"], "w", encoding="utf-8", newline="") as stream:
+        writer = csv.DictWriter(stream, ["title", "complete", "priority"])
+        writer.writeheader()
+        writer.writerows(rows(count))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="todo-bench-") as root:
+        paths = write_files(root, args.rows)
+        print(f"{args.rows} rows")
+        print(f"{'format':<8} {'MiB':>6} {'rows/s':>9} {'peak KiB':>9}")
+        for fmt, path in paths.items():
+            assert datasets.detect_format(path) == fmt
+            tracemalloc.start()
+            started = time.perf_counter()
+            count = sum(datasets.clean_row(row) is not None for row in datasets.iter_rows(path, fmt))
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert count == args.rows
+            print(
+                f"{fmt:<8} {os.path.getsize(path) / 2**20:>6.1f} "
+                f"{count / elapsed:>9.0f} {peak / 1024:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Re-import cost of ``import_dataset --upsert``: a first import, the same
+file again, then with a fraction of its rows changed.
+
+Every row has an ``external_id``; a changed row gets a new title. The
+re-imports decode the whole file and send every row to SQLite, but only
+the changed rows are written (with their search index and counter
+triggers).
+
+Usage:
+    python benchmarks/import_upsert.py --rows 200000 --changed 0.01
+"""
+
+import argparse
+import json
+import time
+from io import StringIO
+
+from _support import scratch_db, setup_django
+
+
+def write_dataset(path, rows, changed_every=0):
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.write("[\n")
+        for i in range(rows):
+            changed = changed_every and i % changed_every == 0
+            row = {"external_id": i, "title": f"Task {i}{' (edited)' if changed else ''}"}
+            stream.write(json.dumps(row) + (",\n" if i < rows - 1 else "\n"))
+        stream.write("]\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--changed", type=float, default=0.01)
+    args = parser.parse_args()
+
+    db_path = scratch_db()
+    setup_django(db_path)
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+    dataset = db_path.with_name("dataset.json")
+
+    runs = [
+        ("first import", 0),
+        ("same file", 0),
+        (f"{args.changed:.0%} changed", max(1, round(1 / args.changed))),
+    ]
+    print(f"{args.rows} rows")
+    print(f"{'run':<14} {'seconds':>8}  result")
+    for name, changed_every in runs:
+        write_dataset(dataset, args.rows, changed_every)
+        out = StringIO()
+        started = time.perf_counter()
+        call_command("import_dataset", path=str(dataset), upsert=True, stdout=out)
+        elapsed = time.perf_counter() - started
+        summary = out.getvalue().strip().splitlines()[-1].split(" in ")[0]
+        print(f"{name:<14} {elapsed:>8.2f}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Import throughput of ``import_dataset``: streamed in one process vs
+decoded by ``--workers`` processes feeding a single writer.
+
+The dataset is a JSON array with one task per line, the layout
+``--workers`` needs. Each run imports it into a fresh copy of the same
+migrated database through ``manage.py``, so process start-up and the
+search index and counter triggers are included.
+
+Usage:
+    python benchmarks/import_workers.py --rows 200000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from _support import ROOT, scratch_db, setup_django
+
+
+def write_dataset(path, rows):
+    with open(path, "w", encoding="utf-8") as stream:
+        stream.write("[\n")
+        for i in range(rows):
+            row = {"title": f"Imported task {i}", "complete": i % 3 == 0}
+            stream.write(json.dumps(row) + (",\n" if i < rows - 1 else "\n"))
+        stream.write("]\n")
+
+
+def run(template, dataset, workers):
+    db_path = template.with_name(f"workers-{workers}.sqlite3")
+    shutil.copy(template, db_path)
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "manage.py", "import_dataset", "--path", str(dataset),
+         "--workers", str(workers)],
+        cwd=ROOT,
+        env={**os.environ, "TODO_DB_PATH": str(db_path)},
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    template = scratch_db("template.sqlite3")
+    setup_django(template)
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+    dataset = template.with_name("dataset.json")
+    write_dataset(dataset, args.rows)
+
+    print(f"{args.rows} rows, {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<12} {'seconds':>8} {'rows/s':>8}")
+    for workers in [0, *args.workers]:
+        elapsed = run(template, dataset, workers)
+        name = f"{workers} worker(s)" if workers else "streamed"
+        print(f"{name:<12} {elapsed:>8.2f} {args.rows / elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-row cost of reading and rendering the task list.
+
+"models" is the former path: full ``Task`` instances, each rendered by
+including ``task_row.html``. "rows" is the current one: ``TaskRow``
+tuples from ``Task.objects.rows()`` rendered by
+``tasks.fragments.render_rows``. Whole lists are read and rendered (no
+pagination) so the per-row cost dominates.
+
+Usage:
+    python benchmarks/list_render.py --sizes 10000 100000
+"""
+
+import argparse
+import time
+
+from _support import migrate_and_seed, scratch_db, setup_django
+
+ORDERING = ("-priority", "id")
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django(scratch_db())
+    migrate_and_seed(0)
+
+    from django.template import engines
+
+    from tasks.fragments import render_rows
+    from tasks.models import Task
+    from tasks.rows import task_rows
+
+    include_loop = engines["django"].from_string(
+        "{% for task in tasks %}{% include 'tasks/task_row.html' %}{% endfor %}"
+    )
+    paths = {
+        "models": (
+            lambda: list(Task.objects.order_by(*ORDERING)),
+            lambda tasks: include_loop.render({"tasks": tasks}),
+        ),
+        "rows": (
+            lambda: task_rows(Task.objects.rows().order_by(*ORDERING)),
+            render_rows,
+        ),
+    }
+
+    print(f"{'tasks':>8} {'path':<7} {'fetch us/row':>13} {'render us/row':>14} {'total us/row':>13}")
+    seeded = 0
+    for size in sorted(args.sizes):
+        migrate_and_seed(size - seeded)
+        seeded = size
+        for name, (fetch, render) in paths.items():
+            fetch_time, tasks = best_of(args.repeat, fetch)
+            render_time, html = best_of(args.repeat, lambda: render(tasks))
+            assert html.count('class="item-row"') == size
+            print(
+                f"{size:>8} {name:<7} {fetch_time / size * 1e6:>13.2f} "
+                f"{render_time / size * 1e6:>14.2f} "
+                f"{(fetch_time + render_time) / size * 1e6:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
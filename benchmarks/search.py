@@ -0,0 +1,69 @@
+"""
+Latency of title search: the FTS5 index against a ``title__icontains`` scan.
+
+Seeds a scratch database with tasks whose titles are drawn from a
+vocabulary of a few thousand words, then times ranked prefix queries
+through ``tasks.search`` and the equivalent ``LIKE '%...%'`` filter the
+ORM would otherwise run. A LIKE scan is cheap when a match shows up early
+in the table, and reads every row when the word is rare or absent; the
+FTS5 cost grows with the number of matches to rank instead.
+
+Usage:
+    python benchmarks/search.py --tasks 1000000
+"""
+
+import argparse
+import random
+import time
+
+from _support import migrate_and_seed, percentile, scratch_db, setup_django
+
+SYLLABLES = "ba be bi bo bu da de di do du ka ke ki ko ku la le li lo lu ma me mi mo mu".split()
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES[:8]]
+QUERIES = ["babada", "kol", "lilobe dumeda", "mumubi", "zzz", "lo"]
+
+
+def random_title(rng):
+    def title(i):
+        return " ".join(rng.choices(WORDS, k=rng.randint(2, 6))) + f" #{i}"
+    return title
+
+
+def timed(func, repeat):
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django(scratch_db())
+    migrate_and_seed(args.tasks, title=random_title(random.Random(0)))
+
+    from tasks import search
+    from tasks.models import Task
+
+    print(f"{args.tasks} tasks, top {args.limit} matches")
+    print(f"{'query':<14} {'fts5 p50 ms':>12} {'icontains p50 ms':>17}")
+    for query in QUERIES:
+        fts = timed(lambda: search.search(query, args.limit), args.repeat)
+        scan = timed(
+            lambda: list(Task.objects.filter(title__icontains=query)[: args.limit]),
+            args.repeat,
+        )
+        print(
+            f"{query:<14} {percentile(fts, 0.5) * 1000:>12.1f} "
+            f"{percentile(scan, 0.5) * 1000:>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
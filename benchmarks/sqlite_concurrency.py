@@ -0,0 +1,119 @@
+"""
+Concurrent writes against SQLite: default settings vs the production
+profile (WAL, pragmas, persistent connections, BEGIN IMMEDIATE).
+
+Each profile gets a fresh copy of the same seeded database. Writer processes POST new
+tasks to the home page through the test client (form validation, save,
+counter triggers and cache invalidation included) while reader processes
+stream the NDJSON export, all for the same wall-clock window. A write
+that fails with "database is locked" counts as a lock error.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py --writers 8 --readers 4 --seconds 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import time
+
+from _support import migrate_and_seed, scratch_db, setup_django
+
+PROFILES = {
+    "default (todo.settings)": "todo.settings",
+    "production (todo.settings_production)": "todo.settings_production",
+}
+
+
+def worker(settings_module, db_path, role, barrier, seconds, results):
+    import logging
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+    setup_django(db_path, settings_module)
+    logging.disable(logging.CRITICAL)
+
+    from django.db import OperationalError
+    from django.test import Client
+
+    client = Client(HTTP_HOST="localhost")
+    done = locked = failed = 0
+    barrier.wait()
+    deadline = time.monotonic() + seconds
+    try:
+        while time.monotonic() < deadline:
+            try:
+                if role == "writer":
+                    response = client.post("/", {"title": f"Stress {os.getpid()} {done}"})
+                else:
+                    response = client.get("/api/tasks/", {"limit": 500})
+                    b"".join(response.streaming_content)
+            except OperationalError as error:
+                if "locked" not in str(error):
+                    raise
+                locked += 1
+                continue
+            if response.status_code >= 400:
+                failed += 1
+            else:
+                done += 1
+    finally:
+        results.put((role, done, locked, failed))
+
+
+def run(settings_module, seeded, args):
+    context = multiprocessing.get_context("spawn")
+    db_path = scratch_db()
+    shutil.copy(seeded, db_path)
+    roles = ["writer"] * args.writers + ["reader"] * args.readers
+    barrier = context.Barrier(len(roles))
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(settings_module, db_path, role, barrier, args.seconds, results),
+        )
+        for role in roles
+    ]
+    for process in processes:
+        process.start()
+    totals = {"writer": [0, 0, 0], "reader": [0, 0, 0]}
+    for _ in processes:
+        role, *counts = results.get()
+        totals[role] = [a + b for a, b in zip(totals[role], counts)]
+    for process in processes:
+        process.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    seeded = scratch_db("seeded.sqlite3")
+    setup_django(seeded)
+    migrate_and_seed(args.tasks)
+    from django.db import connections
+
+    connections.close_all()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g} s, {args.tasks} tasks")
+    print(f"{'profile':<38} {'writes/s':>9} {'locked':>7} {'lock %':>7} {'reads/s':>8}")
+    for name, settings_module in PROFILES.items():
+        totals = run(settings_module, seeded, args)
+        writes, locked, failed = totals["writer"]
+        reads = totals["reader"][0]
+        attempts = writes + locked + failed
+        print(
+            f"{name:<38} {writes / args.seconds:>9.0f} {locked:>7} "
+            f"{100 * locked / max(attempts, 1):>6.1f}% {reads / args.seconds:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Render time of the home page (``list.html``) per template loader setup.
+
+"uncached" reads and parses every template on each use (the plain
+filesystem and app directories loaders); "cached" is the production
+profile (``todo.settings_production``): the cached loader, warmed once.
+Each render is the full page for a list of N tasks: ``task_list.html``
+with its rows, then ``list.html`` around it.
+
+Usage:
+    python benchmarks/template_render.py --sizes 10 50 500 5000
+"""
+
+import argparse
+import time
+
+from _support import migrate_and_seed, scratch_db, setup_django
+
+APP_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+
+def engines():
+    from django.template.backends.django import DjangoTemplates
+
+    def backend(name, loaders):
+        return DjangoTemplates({
+            "NAME": name,
+            "DIRS": [],
+            "APP_DIRS": False,
+            "OPTIONS": {"loaders": loaders, "debug": False},
+        })
+
+    return {
+        "uncached": backend("uncached", APP_LOADERS),
+        "cached": backend(
+            "cached", [("django.template.loaders.cached.Loader", APP_LOADERS)]
+        ),
+    }
+
+
+_compiled = {}
+
+
+def render_page(engine, rows):
+    from django.conf import settings
+
+    from tasks.forms import TaskForm
+    from tasks.fragments import CompiledRow
+
+    # Same reuse rule as tasks.fragments.render_rows: rebuild the row
+    # patterns whenever the loader hands out a new template object.
+    template = engine.get_template("tasks/task_row.html")
+    compiled = _compiled.get(engine.name)
+    if compiled is None or compiled.template is not template:
+        compiled = _compiled[engine.name] = CompiledRow(template)
+    task_list = engine.get_template("tasks/task_list.html").render(
+        {"rows": compiled.render(rows), "page": None, "counters": None}
+    )
+    return engine.get_template("tasks/list.html").render(
+        {
+            "form": TaskForm(),
+            "APP_VERSION": settings.APP_VERSION,
+            "task_list": task_list,
+            "csrf_token": "benchmark",
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django(scratch_db())
+    migrate_and_seed(max(args.sizes))
+
+    from tasks.models import Task
+    from tasks.rows import task_rows
+
+    print(f"{'tasks':>6} {'loaders':<9} {'ms/page':>8} {'bytes':>8}")
+    for size in args.sizes:
+        rows = task_rows(Task.objects.rows().order_by("-priority", "id")[:size])
+        for name, engine in engines().items():
+            html = render_page(engine, rows)  # warm-up (fills the cached loader)
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                render_page(engine, rows)
+            elapsed = (time.perf_counter() - started) / args.repeat
+            print(f"{size:>6} {name:<9} {elapsed * 1000:>8.2f} {len(html.encode()):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,16 @@ else
     echo "Tests passed"
 fi
 
+# ---- Static files ----
+# Hashed copies plus .gz/.br variants in STATIC_ROOT (tasks.staticfiles).
+echo "📦 Collecting static files..."
+if ! DJANGO_SETTINGS_MODULE=todo.settings_production DJANGO_SECRET_KEY="${DJANGO_SECRET_KEY:-build}" \
+    py -3.12 -m pipenv run python manage.py collectstatic --noinput --clear; then
+    echo "collectstatic failed."
+    exit 1
+fi
+echo "Static files collected"
+
 # ---- Update APP_VERSION ----
 echo "Update version ${VERSION_VAR} -> ${VERSION}"
 
@@ -0,0 +1,183 @@
+"""
+JSON API for tasks.
+
+``GET /api/tasks/`` streams tasks as NDJSON (one JSON object per line) in
+the home page order. Rows are read with ``QuerySet.iterator`` so an export
+of any size runs in constant memory. Every row carries its ``cursor``:
+passing the last one received as ``?after=`` resumes the listing right
+after it, and ``?limit=`` bounds the number of rows returned.
+``?search=`` lists the tasks whose title matches instead, best match
+first (see :mod:`tasks.search`).
+
+``POST /api/tasks/`` creates a task, ``GET``/``PATCH``/``DELETE`` on
+``/api/tasks/<id>/`` read, update and delete one. Payloads are validated
+with :class:`tasks.forms.TaskForm`, like the HTML views.
+
+``POST /api/tasks/bulk/`` applies one action to many tasks in a single
+statement (see :mod:`tasks.bulk`)::
+
+    {"action": "complete", "ids": [1, 2, 3]}
+    {"action": "create", "tasks": [{"title": "..."}, ...]}
+"""
+
+import itertools
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from . import bulk, search
+from .forms import TaskForm
+from .models import Task
+from .pagination import decode_cursor, following, make_cursor
+from .routers import replica_reads
+
+FIELDS = ("id", "title", "complete", "priority", "created", "updated")
+EDITABLE_FIELDS = ("title", "complete", "priority")
+
+
+def serialize(row):
+    """JSON-ready dict for a task, given as a ``values()`` dict or instance."""
+    if isinstance(row, Task):
+        row = {field: getattr(row, field) for field in FIELDS}
+    row["cursor"] = make_cursor(row["priority"], row["id"])
+    return row
+
+
+def _ndjson_lines(querysets, chunk_size):
+    encoder = DjangoJSONEncoder()
+    for queryset in querysets:
+        for row in queryset.values(*FIELDS).iterator(chunk_size=chunk_size):
+            yield encoder.encode(serialize(row)) + "\n"
+
+
+def _error(message, status, **extra):
+    return JsonResponse({"error": message, **extra}, status=status)
+
+
+def _read_json(request):
+    try:
+        payload = json.loads(request.body or b"{}")
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _save(form, status):
+    if not form.is_valid():
+        return _error("invalid task", 400, errors=form.errors.get_json_data())
+    task = form.save()
+    return JsonResponse(serialize(task), status=status, encoder=DjangoJSONEncoder)
+
+
+def _search(request, query):
+    limit = request.GET.get("limit", str(settings.TASKS_SEARCH_LIMIT))
+    if not limit.isdigit():
+        return _error("invalid limit", 400)
+    limit = min(int(limit), settings.TASKS_SEARCH_LIMIT)
+    encoder = DjangoJSONEncoder()
+    lines = (
+        encoder.encode(serialize(task)) + "\n"
+        for task in search.search(query, limit, Task.objects.all())
+    )
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
+def _list(request):
+    query = request.GET.get("search", "").strip()
+    if query:
+        return _search(request, query)
+
+    after = request.GET.get("after")
+    key = decode_cursor(after)
+    if after and key is None:
+        return _error("invalid cursor", 400)
+
+    lines = _ndjson_lines(
+        following(Task.objects.all(), key), settings.TASKS_API_CHUNK_SIZE
+    )
+    limit = request.GET.get("limit")
+    if limit is not None:
+        if not limit.isdigit():
+            return _error("invalid limit", 400)
+        lines = itertools.islice(lines, int(limit))
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
+@csrf_exempt
+@require_http_methods(["GET", "HEAD", "POST"])
+def task_collection(request):
+    if request.method == "POST":
+        payload = _read_json(request)
+        if payload is None:
+            return _error("request body must be a JSON object", 400)
+        return _save(TaskForm(payload), status=201)
+    return _list(request)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "HEAD", "PATCH", "DELETE"])
+@replica_reads
+def task_detail(request, pk):
+    task = Task.objects.filter(id=pk).first()
+    if task is None:
+        return _error("task not found", 404)
+
+    if request.method == "DELETE":
+        bulk.delete([task.id])
+        return HttpResponse(status=204)
+
+    if request.method == "PATCH":
+        payload = _read_json(request)
+        if payload is None:
+            return _error("request body must be a JSON object", 400)
+        data = {**model_to_dict(task, fields=EDITABLE_FIELDS), **payload}
+        return _save(TaskForm(data, instance=task), status=200)
+
+    return JsonResponse(serialize(task), encoder=DjangoJSONEncoder)
+
+
+def _bulk_items(payload, name, kind):
+    items = payload.get(name)
+    if not isinstance(items, list) or not items:
+        return None
+    if len(items) > settings.TASKS_BULK_MAX_ITEMS:
+        return None
+    if kind is int:
+        if not all(type(item) is int for item in items):
+            return None
+        items = list(dict.fromkeys(items))
+    return items
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def task_bulk(request):
+    payload = _read_json(request)
+    if payload is None:
+        return _error("request body must be a JSON object", 400)
+
+    action = payload.get("action")
+    if action not in bulk.ACTIONS:
+        return _error("unknown action", 400, actions=list(bulk.ACTIONS))
+
+    limit = settings.TASKS_BULK_MAX_ITEMS
+    if action == "create":
+        rows = _bulk_items(payload, "tasks", dict)
+        if rows is None:
+            return _error(f"'tasks' must be a list of 1 to {limit} objects", 400)
+        results = bulk.create(rows)
+    else:
+        ids = _bulk_items(payload, "ids", int)
+        if ids is None:
+            return _error(f"'ids' must be a list of 1 to {limit} integers", 400)
+        if action == "delete":
+            results = bulk.delete(ids)
+        else:
+            results = bulk.update(action, ids)
+
+    return JsonResponse({"action": action, "results": results})
@@ -1,6 +1,28 @@
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import checks, signals, sqlite  # noqa: F401
+
+        if settings.TASKS_WARM_TEMPLATES:
+            self.warm_templates()
+
+    def warm_templates(self):
+        """
+        Load every ``tasks/*.html`` template into the cached loader, and
+        build the compiled list row patterns (``tasks.fragments``).
+        """
+        from django.template.loader import get_template
+
+        from .fragments import render_rows
+
+        for path in sorted(Path(self.path, 'templates', 'tasks').glob('*.html')):
+            get_template(f'tasks/{path.name}')
+        render_rows([])
@@ -0,0 +1,96 @@
+"""
+Hot/cold split of the task table.
+
+Completed tasks left untouched for ``TASKS_ARCHIVE_AFTER_DAYS`` move to
+:class:`~tasks.models.ArchivedTask` (``archive_tasks`` command), which
+keeps the table the home page sorts, and its indexes, small.
+
+Tasks move in batches of consecutive ids. Each batch is one transaction
+of two set-based statements over the same id range: ``INSERT INTO ...
+SELECT`` copies the rows to the archive, ``DELETE`` removes them from the
+hot table (the counter and search triggers follow). No row is loaded
+into Python, and the write lock is held for one batch at a time.
+
+The ``DELETE`` bypasses model signals, so each batch publishes live
+events itself, like ``tasks.bulk``.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import events
+from .models import ArchivedTask, Task
+from .sqlite import quote_column, quote_table
+
+COPIED_FIELDS = ("title", "complete", "priority", "created", "updated")
+
+
+def _archivable(cutoff):
+    return Task.objects.filter(complete=True, updated__lt=cutoff)
+
+
+def id_ranges(cutoff, batch_size):
+    """Yield ``(first, last)`` id ranges holding ``batch_size`` archivable tasks each."""
+    ids = _archivable(cutoff).order_by("id").values_list("id", flat=True)
+    last = 0
+    while batch := list(ids.filter(id__gt=last)[:batch_size]):
+        last = batch[-1]
+        yield batch[0], last
+
+
+def move_range(first, last, cutoff):
+    """Move the archivable tasks with ids in ``[first, last]``; return how many moved."""
+    where = (
+        "{id} BETWEEN %s AND %s AND {complete} AND {updated} < %s"
+        " AND {deleted_at} IS NULL"
+    ).format(
+        id=quote_column(Task, "id"),
+        complete=quote_column(Task, "complete"),
+        updated=quote_column(Task, "updated"),
+        deleted_at=quote_column(Task, "deleted_at"),
+    )
+    params = [first, last, connection.ops.adapt_datetimefield_value(cutoff)]
+    insert = "INSERT INTO {} ({}, {}, {}) SELECT {}, {}, %s FROM {} WHERE {}".format(
+        quote_table(ArchivedTask),
+        quote_column(ArchivedTask, "task_id"),
+        ", ".join(quote_column(ArchivedTask, name) for name in COPIED_FIELDS),
+        quote_column(ArchivedTask, "archived"),
+        quote_column(Task, "id"),
+        ", ".join(quote_column(Task, name) for name in COPIED_FIELDS),
+        quote_table(Task),
+        where,
+    )
+    delete = "DELETE FROM {} WHERE {} RETURNING {}".format(
+        quote_table(Task), where, quote_column(Task, "id")
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic(), connection.cursor() as cursor:
+        # The INSERT takes the write lock: no task can change before the
+        # DELETE, which therefore removes exactly the rows just copied.
+        cursor.execute(insert, [now, *params])
+        cursor.execute(delete, params)
+        moved = [row[0] for row in cursor.fetchall()]
+        if moved:
+            events.tasks_deleted(moved)
+    return len(moved)
+
+
+def archive_tasks(days=None, batch_size=None, progress=None):
+    """
+    Archive the tasks completed and unchanged for ``days``; return how many
+    moved. ``progress(moved_so_far)`` is called after each batch.
+    """
+    if days is None:
+        days = settings.TASKS_ARCHIVE_AFTER_DAYS
+    if batch_size is None:
+        batch_size = settings.TASKS_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+    for first, last in id_ranges(cutoff, batch_size):
+        total += move_range(first, last, cutoff)
+        if progress is not None:
+            progress(total)
+    return total
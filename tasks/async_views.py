@@ -0,0 +1,158 @@
+"""
+Async versions of the views in ``tasks.views``, served when the project
+runs under ASGI (``todo.asgi`` sets ``TASKS_ASYNC_VIEWS``).
+
+They go through the async ORM and cache API (``aget``, ``acreate``,
+``async for``...) so a request never parks a worker thread while waiting
+on the database. Template rendering stays synchronous: it does no I/O once
+the rows are loaded.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import bulk
+from .cache import alist_version, atask_list_key
+from .counters import aget_counters
+from .events import broker
+from .forms import TaskForm
+from .fragments import (
+	invalid_response,
+	removed_response,
+	render_rows,
+	row_response,
+	wants_fragment,
+)
+from .models import Task
+from .pagination import apaginate
+from .routers import replica_reads
+from .rows import task_rows
+from .search import search
+from .views import _make_etag
+
+
+def _not_modified(request, etag, last_modified=None):
+	"""The 304 response when the request validators match, else None."""
+	if request.method not in ('GET', 'HEAD'):
+		return None
+	timestamp = int(last_modified.timestamp()) if last_modified else None
+	return get_conditional_response(request, etag=quote_etag(etag), last_modified=timestamp)
+
+def _set_validators(request, response, etag, last_modified=None):
+	if request.method in ('GET', 'HEAD'):
+		response.headers.setdefault('ETag', quote_etag(etag))
+		if last_modified:
+			response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+	return response
+
+
+@replica_reads
+async def index(request):
+	form = TaskForm()
+
+	if request.method == 'POST':
+		form = TaskForm(request.POST)
+		if form.is_valid():
+			task = await Task.objects.acreate(**form.cleaned_data)
+			if wants_fragment(request):
+				return row_response(task, status=201)
+		elif wants_fragment(request):
+			return invalid_response(form)
+		return redirect('/')
+
+	etag = _make_etag(request, await alist_version(request), request.GET.urlencode())
+	response = _not_modified(request, etag)
+	if response is not None:
+		return response
+
+	context= {'form':form, 'APP_VERSION': settings.APP_VERSION}
+
+	after, before = request.GET.get('after'), request.GET.get('before')
+	query = request.GET.get('search', '').strip()
+	context['search'] = query
+	key = await atask_list_key(after, before, query, request)
+	task_list = await cache.aget(key)
+	if task_list is None:
+		if query:
+			# The MATCH goes through a raw cursor, which has no async API.
+			page = None
+			tasks = await sync_to_async(search)(query, settings.TASKS_SEARCH_LIMIT)
+		else:
+			page = await apaginate(Task.objects.rows(), settings.TASKS_PAGE_SIZE, after=after, before=before)
+			tasks = task_rows(page.tasks)
+		counters = await aget_counters()
+		task_list = render_to_string('tasks/task_list.html', {'rows':render_rows(tasks),'matches':len(tasks),'page':page,'search':query,'counters':counters})
+		await cache.aset(key, task_list, settings.TASKS_LIST_CACHE_TIMEOUT)
+		context.update({'tasks':tasks,'page':page})
+
+	context['task_list'] = task_list
+	return _set_validators(request, render(request, 'tasks/list.html',context), etag)
+
+@replica_reads
+async def updateTask(request,pk):
+	task = await Task.objects.aget(id=pk)
+	etag = _make_etag(request, pk, task.updated)
+	response = _not_modified(request, etag, task.updated)
+	if response is not None:
+		return response
+
+	form = TaskForm(instance=task)
+
+	if request.method == "POST":
+		form = TaskForm(request.POST,instance=task)
+		if form.is_valid():
+			# is_valid() copied the cleaned data onto the instance.
+			await form.instance.asave()
+			if wants_fragment(request):
+				return row_response(form.instance)
+			return redirect('/')
+		if wants_fragment(request):
+			return invalid_response(form)
+
+	context = {'form':form}
+	return _set_validators(request, render(request, 'tasks/update_task.html',context), etag, task.updated)
+
+@replica_reads
+async def deleteTask(request,pk):
+	item = await Task.objects.aget(id=pk)
+	etag = _make_etag(request, pk, item.updated)
+	response = _not_modified(request, etag, item.updated)
+	if response is not None:
+		return response
+
+	if request.method == "POST":
+		# A raw UPDATE ... RETURNING, which has no async API.
+		await sync_to_async(bulk.delete)([item.id])
+		if wants_fragment(request):
+			return removed_response(pk)
+		return redirect('/')
+
+	context = {'item':item}
+	return _set_validators(request, render(request, 'tasks/delete.html', context), etag, item.updated)
+
+async def _event_stream():
+	queue = broker.subscribe()
+	try:
+		yield 'retry: 3000\n\n'
+		while True:
+			try:
+				yield await asyncio.wait_for(queue.get(), settings.TASKS_EVENTS_KEEPALIVE)
+			except asyncio.TimeoutError:
+				# Comment line: keeps proxies from closing an idle stream.
+				yield ': keepalive\n\n'
+	finally:
+		broker.unsubscribe(queue)
+
+async def taskEvents(request):
+	response = StreamingHttpResponse(_event_stream(), content_type='text/event-stream')
+	response['Cache-Control'] = 'no-cache'
+	response['X-Accel-Buffering'] = 'no'
+	return response
@@ -0,0 +1,104 @@
+"""
+Set-based operations on many tasks at once.
+
+Each action is atomic and set-based, whatever the number of tasks: a
+single ``UPDATE ... WHERE id IN (...)`` statement, or one ``bulk_create``
+in a transaction. ``RETURNING`` tells which of the requested ids actually
+existed, so per-id results need no extra query.
+
+Deleting only sets ``deleted_at``: a one-column update that leaves the
+row, its index entries and the search index in place, and can be undone
+until ``purge_deleted`` removes the tombstones (``tasks.purge``).
+
+These statements bypass model signals, so they publish live events
+(``tasks.events``) themselves.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import events
+from .forms import TaskForm
+from .models import Task
+from .sqlite import quote_column, quote_table
+
+UPDATE_ACTIONS = {
+    "complete": ("complete", True),
+    "uncomplete": ("complete", False),
+    "prioritise": ("priority", True),
+    "unprioritise": ("priority", False),
+}
+ACTIONS = (*UPDATE_ACTIONS, "delete", "create")
+
+
+def _where_ids(ids):
+    # Deleted tasks are not found, as through the default manager.
+    return "{} IN ({}) AND {} IS NULL".format(
+        quote_column(Task, "id"), ", ".join(["%s"] * len(ids)), quote_column(Task, "deleted_at")
+    )
+
+
+def _results(ids, touched, status):
+    return [
+        {"id": pk, "status": status if pk in touched else "not_found"} for pk in ids
+    ]
+
+
+def update(action, ids):
+    field, value = UPDATE_ACTIONS[action]
+    sql = "UPDATE {} SET {} = %s, {} = %s WHERE {} RETURNING {}".format(
+        quote_table(Task),
+        quote_column(Task, field),
+        quote_column(Task, "updated"),
+        _where_ids(ids),
+        quote_column(Task, "id"),
+    )
+    with connection.cursor() as cursor:
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        cursor.execute(sql, [value, now, *ids])
+        touched = {row[0] for row in cursor.fetchall()}
+    if touched:
+        events.tasks_saved(touched)
+    return _results(ids, touched, "updated")
+
+
+def delete(ids):
+    sql = "UPDATE {} SET {} = %s, {} = %s WHERE {} RETURNING {}".format(
+        quote_table(Task),
+        quote_column(Task, "deleted_at"),
+        quote_column(Task, "updated"),
+        _where_ids(ids),
+        quote_column(Task, "id"),
+    )
+    with connection.cursor() as cursor:
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        cursor.execute(sql, [now, now, *ids])
+        touched = {row[0] for row in cursor.fetchall()}
+    if touched:
+        events.tasks_deleted(touched)
+    return _results(ids, touched, "deleted")
+
+
+def create(rows):
+    """
+    Validate each row with :class:`TaskForm` and insert the valid ones with
+    one ``bulk_create``. Results are reported by position in ``rows``.
+    """
+    results, tasks = [], []
+    for index, row in enumerate(rows):
+        form = TaskForm(row if isinstance(row, dict) else {})
+        if form.is_valid():
+            tasks.append((index, form.save(commit=False)))
+            results.append(None)
+        else:
+            errors = form.errors.get_json_data()
+            results.append({"index": index, "status": "invalid", "errors": errors})
+
+    with transaction.atomic():
+        Task.objects.bulk_create([task for _, task in tasks])
+        if tasks:
+            events.tasks_saved([task.id for _, task in tasks], created=True)
+
+    for index, task in tasks:
+        results[index] = {"index": index, "status": "created", "id": task.id}
+    return results
@@ -0,0 +1,91 @@
+"""
+Caching of the rendered task list fragment.
+
+Fragments are stored under keys that embed the list version: the
+``version`` of the counters row, which a trigger moves on every write to
+the task table (migration 0011). A write from any process, through the
+ORM or raw SQL, thus makes every previously cached fragment unreachable
+at once; stale entries then simply expire. Reading the version costs one
+primary key lookup per request: passing the ``request`` keeps it for the
+rest of the request.
+
+With a read replica (``tasks.routers``) the version is read from the
+database the rows come from, and the key also names that database: a
+fragment rendered from the lagging replica is never served to a client
+pinned to the primary, nor the other way round.
+
+The keys also carry ``APP_VERSION``, as the ETags of ``tasks.views`` do:
+with a cache shared by several processes, a new release never serves a
+fragment rendered from the previous one's templates.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.db import router
+
+from .counters import aget_counters, get_counters
+from .models import Task
+from .pagination import decode_cursor
+
+VERSION_ATTR = "_tasks_list_version"
+
+
+def _version(counters, request):
+    if counters.pk is None:
+        # No counters row, so no version: never reuse a cached entry.
+        version = time.time_ns()
+    else:
+        version = counters.version
+    if request is not None:
+        setattr(request, VERSION_ATTR, version)
+    return version
+
+
+def list_version(request=None):
+    """
+    The current list version. It also marks the whole task table for
+    conditional GETs: any write changes it, deletions included.
+    """
+    version = getattr(request, VERSION_ATTR, None)
+    if version is None:
+        version = _version(get_counters(), request)
+    return version
+
+
+def _task_list_key(version, after, before, search):
+    # The database the fragment is rendered from.
+    source = router.db_for_read(Task)
+    if search:
+        # Search results are one ranked page: only the query matters, hashed
+        # to keep arbitrary user input out of the key.
+        digest = hashlib.md5(search.encode(), usedforsecurity=False).hexdigest()
+        return "tasks:search:{}:{}:v{}:{}:{}".format(
+            settings.APP_VERSION, source, version, settings.TASKS_SEARCH_LIMIT, digest
+        )
+    # Only well-formed cursors end up in the key; anything else renders
+    # the first page and shares its entry.
+    after = after if decode_cursor(after) else ""
+    before = before if decode_cursor(before) else ""
+    return "tasks:list:{}:{}:v{}:{}:{}:{}".format(
+        settings.APP_VERSION, source, version, settings.TASKS_PAGE_SIZE, after, before
+    )
+
+
+def task_list_key(after=None, before=None, search="", request=None):
+    """Cache key of the list fragment for the given page cursors or search."""
+    return _task_list_key(list_version(request), after, before, search)
+
+
+# Async counterparts, for the views in tasks.async_views.
+
+async def alist_version(request=None):
+    version = getattr(request, VERSION_ATTR, None)
+    if version is None:
+        version = _version(await aget_counters(), request)
+    return version
+
+
+async def atask_list_key(after=None, before=None, search="", request=None):
+    return _task_list_key(await alist_version(request), after, before, search)
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+
+
+@register()
+def check_async_middleware(app_configs, **kwargs):
+    """
+    With async views, a sync-only middleware makes Django adapt every
+    request back to a thread, which cancels the benefit of running async.
+    """
+    if not settings.TASKS_ASYNC_VIEWS:
+        return []
+    return [
+        Warning(
+            f"Middleware {path} is not async-capable.",
+            hint="Set async_capable = True on it, or remove it when running under ASGI.",
+            obj=path,
+            id="tasks.W001",
+        )
+        for path in settings.MIDDLEWARE
+        if not getattr(import_string(path), "async_capable", False)
+    ]
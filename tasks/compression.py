@@ -0,0 +1,111 @@
+"""
+gzip and brotli encoders shared by the compression middleware
+(``tasks.middleware``) and the precompressed static files
+(``tasks.staticfiles``).
+
+Brotli is optional: without the ``brotli`` package only gzip is offered.
+"""
+
+import re
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Highest compression, for files compressed once at collectstatic time.
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+
+class GzipEncoder:
+    coding = "gzip"
+    suffix = ".gz"
+
+    def __init__(self, level=GZIP_LEVEL):
+        # wbits 16 + MAX_WBITS: gzip container, header mtime 0.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    coding = "br"
+    suffix = ".br"
+
+    def __init__(self, quality=BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def available_encoders():
+    """Encoder classes usable here, preferred first."""
+    if brotli is None:
+        return [GzipEncoder]
+    return [BrotliEncoder, GzipEncoder]
+
+
+def compress(encoder, data):
+    """``data`` compressed in one go by an ``encoder`` instance."""
+    return encoder.compress(data) + encoder.finish()
+
+
+def compress_iterator(encoder, chunks):
+    """
+    Compress an iterable of byte strings incrementally. Output is yielded
+    whenever the compressor has some; it buffers small chunks rather than
+    flushing each one, which would ruin the ratio of row-per-chunk streams.
+    """
+    for chunk in chunks:
+        data = encoder.compress(chunk)
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+async def acompress_iterator(encoder, chunks):
+    """:func:`compress_iterator` for async iterators."""
+    async for chunk in chunks:
+        data = encoder.compress(chunk)
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+def _accepted_codings(header):
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        match = re.search(r"q=([0-9.]+)", params)
+        try:
+            accepted[coding.strip().lower()] = float(match.group(1)) if match else 1.0
+        except ValueError:
+            continue
+    return accepted
+
+
+def accepts(request, coding):
+    """Whether ``Accept-Encoding`` allows ``coding`` (non-zero q-value)."""
+    accepted = _accepted_codings(request.headers.get("Accept-Encoding", ""))
+    return accepted.get(coding, accepted.get("*", 0)) > 0
+
+
+def negotiate(request):
+    """The preferred available encoder class the request accepts, or None."""
+    for encoder in available_encoders():
+        if accepts(request, encoder.coding):
+            return encoder
+    return None
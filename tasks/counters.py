@@ -0,0 +1,68 @@
+"""
+Task totals shown on the home page ("N open, M done, K priority").
+
+They are read from the single :class:`~tasks.models.TaskCounters` row, a
+primary key lookup whatever the size of the task table, instead of
+``COUNT(*)`` aggregates. Triggers keep that row up to date (migration
+0006); :func:`reconcile` recomputes it from the table should it drift,
+e.g. after a raw import with triggers disabled or a restored backup.
+"""
+
+import time
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from .models import Task, TaskCounters
+
+COUNTERS_ID = 1
+FIELDS = ("total", "complete", "priority")
+
+
+def get_counters():
+    """The current totals; all zero if the counters row is missing."""
+    try:
+        return TaskCounters.objects.get(id=COUNTERS_ID)
+    except TaskCounters.DoesNotExist:
+        return TaskCounters()
+
+
+async def aget_counters():
+    try:
+        return await TaskCounters.objects.aget(id=COUNTERS_ID)
+    except TaskCounters.DoesNotExist:
+        return TaskCounters()
+
+
+def count_tasks():
+    """The totals computed from the task table itself (full scan)."""
+    return Task.objects.aggregate(
+        total=Count("id"),
+        complete=Count("id", filter=Q(complete=True)),
+        priority=Count("id", filter=Q(priority=True)),
+    )
+
+
+def reconcile():
+    """
+    Reset the counters row from the task table. Returns the ``{field:
+    (stored, actual)}`` pairs that differed, empty when nothing drifted.
+    """
+    with transaction.atomic():
+        counters, _ = TaskCounters.objects.select_for_update().get_or_create(
+            id=COUNTERS_ID
+        )
+        actual = count_tasks()
+        drift = {
+            field: (getattr(counters, field), actual[field])
+            for field in FIELDS
+            if getattr(counters, field) != actual[field]
+        }
+        if drift:
+            # New totals show on the cached list: move its version too,
+            # past the clock like the triggers of migration 0011.
+            TaskCounters.objects.filter(id=COUNTERS_ID).update(
+                **actual, version=Greatest(F("version") + 1, time.time_ns() // 1000)
+            )
+    return drift
@@ -0,0 +1,372 @@
+"""
+Decoding of task datasets, kept free of Django so that worker processes
+of ``import_dataset --workers`` can use it without setting Django up.
+
+A dataset is a JSON array, NDJSON (one object per line, the format of
+the API export) or CSV with a header line; :func:`detect_format` tells
+them apart from the first byte and :func:`iter_rows` yields the elements
+of any of them. :func:`iter_json_array` streams the elements of a JSON
+array from a file read in fixed-size chunks. NDJSON and CSV lines are
+sliced out of a memory-mapped file (:func:`iter_lines`), so the file is
+never copied as a whole.
+
+Every element comes with the byte offset where it ends in the file, and
+reading can start at such an offset: ``import_dataset`` checkpoints it
+after each batch and ``--resume`` seeks back to it. :func:`fingerprint`
+tells whether a checkpoint belongs to the file.
+
+For parallel imports, :func:`split_points` cuts a file into byte ranges
+that end on a line break and :func:`parse_range` decodes one such range
+on its own; this needs one element per line, as in NDJSON.
+
+:func:`import_key` gives each element the identity that
+``import_dataset --upsert`` matches existing tasks on.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import itertools
+import json
+import mmap
+import os
+import unicodedata
+
+READ_SIZE = 1 << 16
+# Bytes of input decoded by one worker task.
+CHUNK_SIZE = 1 << 20
+FORMATS = ("json", "ndjson", "csv")
+# CSV cells read as true; anything else is false.
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+# Characters that can go on a JSON number.
+_NUMBER_CHARACTERS = set("0123456789.eE+-")
+
+
+class DatasetError(ValueError):
+    """The file is not a valid dataset."""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _Reader:
+    """A text buffer over ``stream``, refilled and trimmed as it is consumed."""
+
+    def __init__(self, stream, read_size, offset=0):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # Byte offset in the file of buffer[mark], see tell().
+        self.offset = offset
+        self.mark = 0
+
+    def fill(self):
+        """Read one more chunk; False at the end of the file."""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer never outgrows a chunk
+        # plus the element being decoded.
+        self.tell()
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = self.mark = 0
+        return True
+
+    def tell(self):
+        """The byte offset of the current position in the file."""
+        # Each character is encoded once, when the position moves past it.
+        self.offset += len(self.buffer[self.mark:self.pos].encode("utf-8"))
+        self.mark = self.pos
+        return self.offset
+
+    def peek(self):
+        """The next non-whitespace character, or "" at the end of the file."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, characters):
+        char = self.peek()
+        if not char or char not in characters:
+            found = repr(char) if char else "end of file"
+            raise DatasetError(f"expected {' or '.join(map(repr, characters))}, found {found}")
+        self.pos += 1
+        return char
+
+    def decode(self):
+        """Decode the JSON value at the current position."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if self.fill():
+                    continue
+                raise DatasetError(str(error)) from error
+            # A number or literal ending the buffer may go on in the next
+            # chunk ("12" of "123"): only trust it with a character after it.
+            # A number may also have been cut right after its integer part
+            # or exponent mark ("-2500." of "-2500.0"): read on until what
+            # follows cannot continue it.
+            if end == len(self.buffer) or (
+                _is_number(value) and self.buffer[end] in _NUMBER_CHARACTERS
+            ):
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def _json_elements(reader, resume=False):
+    # With ``resume``, the reader starts after an element of the array.
+    if not resume:
+        reader.expect("[")
+    elif reader.peek() == ",":
+        reader.pos += 1
+    if reader.peek() == "]":
+        reader.pos += 1
+    else:
+        while True:
+            value = reader.decode()
+            yield value, reader.tell()
+            if reader.expect(",]") == "]":
+                break
+    if reader.peek():
+        raise DatasetError("unexpected data after the array")
+
+
+def iter_json_array(stream, read_size=READ_SIZE):
+    """Yield the elements of the JSON array in the text ``stream`` one by one."""
+    for value, _ in _json_elements(_Reader(stream, read_size)):
+        yield value
+
+
+def detect_format(path):
+    """``"json"``, ``"ndjson"`` or ``"csv"``, from the first character of the file."""
+    with open(path, "rb") as stream:
+        head = stream.read(READ_SIZE).removeprefix(codecs.BOM_UTF8).lstrip()
+    if head.startswith(b"{"):
+        return "ndjson"
+    if head.startswith(b"[") or not head:
+        return "json"
+    return "csv"
+
+
+def fingerprint(path, sample=CHUNK_SIZE):
+    """
+    A SHA-256 of the size and of the first and last ``sample`` bytes of
+    the file at ``path``: it changes when rows are added, removed or
+    rewritten at either end, without reading the whole file.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as stream:
+        digest.update(stream.read(sample))
+        stream.seek(max(size - sample, 0))
+        digest.update(stream.read(sample))
+    return digest.hexdigest()
+
+
+def iter_lines(path, start=0):
+    """
+    Yield ``(line, end)`` for the lines of the file at ``path`` from byte
+    ``start`` on: the line as bytes, line break included, sliced out of a
+    read-only memory map of the file, and the offset where it ends.
+    """
+    if start >= os.path.getsize(path):
+        return
+    with open(path, "rb") as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if start == 0 and data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            start = len(codecs.BOM_UTF8)
+        size = len(data)
+        while start < size:
+            end = data.find(b"\n", start)
+            end = size if end == -1 else end + 1
+            yield data[start:end], end
+            start = end
+
+
+def _decode_line(line, number):
+    try:
+        return json.loads(line)
+    except ValueError as error:
+        raise DatasetError(f"line {number}: {error}") from error
+
+
+def iter_ndjson(path, start=0):
+    """Yield ``(value, end)`` for the JSON value on each non-blank line of ``path``."""
+    for number, (line, end) in enumerate(iter_lines(path, start), 1):
+        if not line.isspace():
+            yield _decode_line(line, number), end
+
+
+def iter_csv(path, start=0):
+    """
+    Yield ``(record, end)`` for each record of the CSV file at ``path``:
+    a dict keyed by the header line, and the offset where it ends.
+    """
+    lines = iter_lines(path)
+    header, position = next(lines, (b"", 0))
+    fieldnames = next(csv.reader([header.decode("utf-8")]), [])
+    if "title" not in fieldnames:
+        raise DatasetError("the CSV header has no 'title' column")
+    if start > position:
+        lines, position = iter_lines(path, start), start
+
+    def text():
+        # The reader pulls one more line only for a quoted line break, so
+        # ``position`` is the end of the record it has just returned.
+        nonlocal position
+        for line, position in lines:
+            yield line.decode("utf-8")
+
+    reader = csv.DictReader(text(), fieldnames)
+    try:
+        for record in reader:
+            yield record, position
+    except csv.Error as error:
+        raise DatasetError(f"line {reader.line_num}: {error}") from error
+
+
+def iter_rows(path, fmt, start=0):
+    """
+    Yield ``(element, end)`` for the elements of the dataset at ``path``,
+    in the format ``fmt``, that end after byte ``start``.
+    """
+    if fmt == "ndjson":
+        yield from iter_ndjson(path, start)
+    elif fmt == "csv":
+        yield from iter_csv(path, start)
+    elif not start or start < os.path.getsize(path):
+        resume = start > 0
+        with open(path, "rb") as binary:
+            if not resume and binary.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8:
+                start = len(codecs.BOM_UTF8)
+            binary.seek(start)
+            # No newline translation: offsets count every byte.
+            stream = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+            yield from _json_elements(_Reader(stream, READ_SIZE, start), resume)
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+def normalise_title(title):
+    """``title`` compared loosely: Unicode-normalised, case-folded, single-spaced."""
+    return " ".join(unicodedata.normalize("NFKC", title).casefold().split())
+
+
+def import_key(row):
+    """
+    The stable identity of a dataset element: a SHA-256 of its
+    ``external_id`` when it has one, else of its normalised title.
+    """
+    external_id = row.get("external_id")
+    if external_id is not None and external_id != "":
+        source = f"id:{external_id}"
+    else:
+        source = f"title:{normalise_title(str(row['title']))}"
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def clean_row(row, keyed=False):
+    """
+    Field values for a ``Task`` from a dataset element, or None when the
+    element is not an object with a title. ``complete`` and ``priority``
+    are only there when the element has them, so that an upsert leaves
+    the others as they are. ``keyed`` adds its ``import_key``.
+    """
+    if not isinstance(row, dict):
+        return None
+    title = row.get("title")
+    if not title:
+        return None
+    fields = {"title": title}
+    for name in ("complete", "priority"):
+        if name in row:
+            fields[name] = _flag(row[name])
+    if keyed:
+        fields["import_key"] = import_key(row)
+    return fields
+
+
+def split_points(path, chunk_size=CHUNK_SIZE, start=0):
+    """
+    Yield ``(start, end)`` byte ranges of about ``chunk_size`` covering
+    ``path`` from byte ``start`` on, cut after line breaks.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as stream:
+        while start < size:
+            stream.seek(min(start + chunk_size, size))
+            stream.readline()
+            end = stream.tell()
+            yield start, end
+            start = end
+
+
+def parse_range(path, start, end, batch_size, keyed=False, fmt="json"):
+    """
+    Decode and clean the elements on the lines of ``path`` between byte
+    ``start`` and ``end``, of a JSON array or NDJSON file (``fmt``).
+    Returns them as ``(fields, skipped, position)`` batches of at most
+    ``batch_size``: the :func:`clean_row` of each valid element, how many
+    were not valid, and the offset where the batch ends.
+    """
+    with open(path, "rb") as stream, mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        size = len(mapped)
+        lines = mapped[start:end].splitlines(keepends=True)
+    ends = list(itertools.accumulate(map(len, lines), initial=start))[1:]
+    if start == 0 and lines:
+        lines[0] = lines[0].removeprefix(codecs.BOM_UTF8)
+    if fmt == "json":
+        body = [index for index, line in enumerate(lines) if not line.isspace()]
+        if start == 0:
+            if not body or not lines[body[0]].lstrip().startswith(b"["):
+                raise DatasetError("expected '[' at the start of the file")
+            lines[body[0]] = lines[body[0]].lstrip()[1:]
+        if end == size:
+            if not body or not lines[body[-1]].rstrip().endswith(b"]"):
+                raise DatasetError("expected ']' at the end of the file")
+            lines[body[-1]] = lines[body[-1]].rstrip()[:-1]
+
+    batches, fields, skipped = [], [], 0
+    for line, line_end in zip(lines, ends):
+        line = line.strip()
+        if fmt == "json":
+            line = line.removesuffix(b",")
+        if line:
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                raise DatasetError(
+                    f"{error} near byte {line_end - len(line)}: --workers needs one element per line"
+                ) from error
+            cleaned = clean_row(row, keyed)
+            if cleaned is None:
+                skipped += 1
+            else:
+                fields.append(cleaned)
+        if len(fields) == batch_size:
+            batches.append((fields, skipped, line_end))
+            fields, skipped = [], 0
+    if not batches or batches[-1][2] != end:
+        batches.append((fields, skipped, end))
+    return batches
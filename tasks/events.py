@@ -0,0 +1,106 @@
+"""
+In-process publish/subscribe of task changes, streamed to browsers as
+Server-Sent Events by ``tasks.async_views.taskEvents``.
+
+Writers publish once their transaction commits: the model signals for
+single saves and deletes, and the set-based paths (bulk API, toggles)
+explicitly. Each SSE connection owns a bounded asyncio queue; publishing
+is thread-safe, so sync views running in worker threads can feed
+subscribers living on the event loop. Nothing is rendered or queried
+while nobody is subscribed.
+
+Events only reach subscribers of the same process: with several ASGI
+workers, each client sees the writes handled by its own worker.
+"""
+
+import asyncio
+import json
+import threading
+
+from django.db import transaction
+
+from .fragments import render_row
+from .models import Task
+
+QUEUE_SIZE = 100
+
+
+def _message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscribe(self):
+        """Register a queue bound to the running event loop."""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    def publish(self, event, data):
+        message = _message(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:
+                # The loop closed without unsubscribing (worker shutdown):
+                # forget the queue rather than fail the writer's on_commit.
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _deliver(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The client cannot keep up: drop its backlog and have it reload.
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(_message("reload", {}))
+
+
+broker = Broker()
+
+
+def _row(task):
+    return {
+        "id": task.id,
+        "priority": task.priority,
+        "html": render_row(task),
+    }
+
+
+def _publish_rows(event, ids):
+    if broker.has_subscribers:
+        for task in Task.objects.filter(id__in=ids):
+            broker.publish(event, _row(task))
+
+
+def _publish_deleted(ids):
+    for pk in ids:
+        broker.publish("deleted", {"id": pk})
+
+
+def tasks_saved(ids, created=False):
+    """Publish ``created``/``updated`` events, with fresh row HTML, on commit."""
+    if broker.has_subscribers:
+        event = "created" if created else "updated"
+        transaction.on_commit(lambda: _publish_rows(event, ids))
+
+
+def tasks_deleted(ids):
+    if broker.has_subscribers:
+        transaction.on_commit(lambda: _publish_deleted(ids))
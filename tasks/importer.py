@@ -0,0 +1,243 @@
+"""
+Streaming import of task datasets (``import_dataset`` command).
+
+A dataset is a JSON array, NDJSON or CSV file of tasks, decoded by
+``tasks.datasets`` one element at a time so that memory stays flat
+whatever the size of the file. The valid rows are inserted with one
+``bulk_create`` per batch, each batch in its own transaction. The search
+index and counters follow through their triggers.
+
+Each transaction also saves the run's :class:`~tasks.models.ImportState`:
+the byte offset where its batch ends, and the counts so far. A run
+interrupted at any point can be resumed from its last committed batch,
+without duplicating or losing a row.
+
+With ``workers``, :func:`import_file` decodes and validates the file in a
+pool of processes, a byte range each, while this process only writes:
+SQLite takes one writer at a time anyway. At most two ranges per worker
+are in flight, which bounds memory whatever the size of the file.
+
+With ``upsert``, each row carries an ``import_key`` (see
+``tasks.datasets.import_key``) and each batch is one ``INSERT ... ON
+CONFLICT (import_key) DO UPDATE`` statement whose ``WHERE`` only lets
+rows that differ through: re-importing the same file writes nothing.
+Tasks deleted since they were imported stay deleted.
+"""
+
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection, reset_queries, transaction
+from django.utils import timezone
+
+from .datasets import (
+    DatasetError,
+    clean_row,
+    detect_format,
+    fingerprint,
+    iter_rows,
+    parse_range,
+    split_points,
+)
+from .models import ImportState, Task
+from .sqlite import quote_column, quote_table
+
+COUNTS = ("imported", "updated", "unchanged", "skipped")
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    # Valid rows already imported by an earlier run of a resumed import.
+    resumed: int = 0
+
+    @property
+    def rows(self):
+        """Valid rows processed so far."""
+        return self.imported + self.updated + self.unchanged
+
+
+def _upsert_sql(names, fields, count):
+    """
+    The upsert of ``count`` rows of the columns ``names``, updating
+    ``fields`` of the existing tasks that differ (see the module docstring).
+    """
+    table = quote_table(Task)
+    values = "({})".format(", ".join(["%s"] * len(names)))
+    fields = [quote_column(Task, name) for name in fields]
+    return (
+        "INSERT INTO {table} ({columns}) VALUES {values} "
+        "ON CONFLICT ({key}) WHERE {key} IS NOT NULL DO UPDATE SET {assignments} "
+        "WHERE {table}.{deleted} IS NULL AND ({changed}) "
+        "RETURNING {created} = {updated}"
+    ).format(
+        table=table,
+        columns=", ".join(quote_column(Task, name) for name in names),
+        values=", ".join([values] * count),
+        key=quote_column(Task, "import_key"),
+        assignments=", ".join(
+            f"{column} = excluded.{column}" for column in [*fields, quote_column(Task, "updated")]
+        ),
+        deleted=quote_column(Task, "deleted_at"),
+        changed=" OR ".join(f"{table}.{column} IS NOT excluded.{column}" for column in fields),
+        created=quote_column(Task, "created"),
+        updated=quote_column(Task, "updated"),
+    )
+
+
+def _last_per_key(fields):
+    # The last row of a repeated import_key wins.
+    return list({row["import_key"]: row for row in fields}.values())
+
+
+def upsert_batch(fields):
+    """
+    Insert or update a task for each dict of ``fields``, matched on its
+    ``import_key``; the last row wins when a key repeats. Only the fields
+    a row carries are updated: a task keeps its ``priority`` when the
+    element has none. Returns ``(imported, updated)``: the tasks created
+    and the existing ones changed.
+    """
+    rows = _last_per_key(fields)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    defaults = {"complete": False, "priority": False, "created": now, "updated": now}
+    # One statement per set of fields, as elements need not all carry the same.
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    imported = updated = 0
+    with connection.cursor() as cursor:
+        for keys, group in groups.items():
+            names = list({**defaults, **group[0]})
+            updates = [name for name in keys if name != "import_key"]
+            batch_size = connection.ops.bulk_batch_size(names, group) or len(group)
+            for offset in range(0, len(group), batch_size):
+                batch = group[offset:offset + batch_size]
+                params = [{**defaults, **row}[name] for row in batch for name in names]
+                cursor.execute(_upsert_sql(names, updates, len(batch)), params)
+                for (created,) in cursor.fetchall():
+                    if created:
+                        imported += 1
+                    else:
+                        updated += 1
+    return imported, updated
+
+
+def write_batches(batches, progress=None, upsert=False, state=None):
+    """
+    Write each ``(fields, skipped, position)`` batch of ``batches`` in its
+    own transaction: one task per dict of ``fields``, inserted, or upserted
+    with ``upsert`` (see :func:`upsert_batch`). The same transaction
+    checkpoints ``state``, an :class:`ImportState`, at ``position``.
+    ``progress(result, elapsed)`` is called after each batch. Returns an
+    :class:`ImportResult`, counted on from ``state``.
+    """
+    started = time.monotonic()
+    result = ImportResult()
+    if state is not None:
+        result = ImportResult(**{name: getattr(state, name) for name in COUNTS})
+        result.resumed = result.rows
+    for fields, batch_skipped, position in batches:
+        with transaction.atomic():
+            imported = updated = 0
+            if fields and upsert:
+                # Rows replaced by a later one with the same key are not
+                # written, so they count neither as updated nor unchanged.
+                fields = _last_per_key(fields)
+                imported, updated = upsert_batch(fields)
+            elif fields:
+                Task.objects.bulk_create([Task(**row) for row in fields])
+                imported = len(fields)
+            result.imported += imported
+            result.updated += updated
+            result.unchanged += len(fields) - imported - updated
+            result.skipped += batch_skipped
+            if state is not None:
+                state.position = position
+                for name in COUNTS:
+                    setattr(state, name, getattr(result, name))
+                state.save(update_fields=["position", *COUNTS, "checkpointed"])
+        if settings.DEBUG:
+            # Django keeps the SQL of every query in memory in DEBUG mode.
+            reset_queries()
+        if progress is not None:
+            progress(result, time.monotonic() - started)
+    return result
+
+
+def _clean_batches(rows, batch_size, keyed):
+    while batch := list(itertools.islice(rows, batch_size)):
+        fields = [cleaned for row, _ in batch if (cleaned := clean_row(row, keyed)) is not None]
+        yield fields, len(batch) - len(fields), batch[-1][1]
+
+
+def _parallel_batches(path, fmt, start, workers, batch_size, keyed):
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        ranges = split_points(path, start=start)
+        while True:
+            for first, last in itertools.islice(ranges, 2 * workers - len(pending)):
+                pending.append(pool.submit(parse_range, path, first, last, batch_size, keyed, fmt))
+            if not pending:
+                return
+            # Ranges are written in file order, as they are read.
+            yield from pending.popleft().result()
+
+
+def _checkpoint(path, fmt, resume):
+    """
+    The :class:`ImportState` of an import of ``path``: the last one of
+    this file when resuming and there is one, else a fresh one.
+    """
+    key = fingerprint(path)
+    if resume:
+        state = ImportState.objects.filter(fingerprint=key).first()
+        if state is not None:
+            return state
+    state, _ = ImportState.objects.update_or_create(
+        fingerprint=key,
+        defaults={
+            "path": str(path),
+            "format": fmt,
+            "position": 0,
+            "finished": False,
+            **dict.fromkeys(COUNTS, 0),
+        },
+    )
+    return state
+
+
+def import_file(path, workers=0, batch_size=None, progress=None, upsert=False, fmt=None, resume=False):
+    """
+    Import the dataset in the file at ``path``, in the format ``fmt`` (one
+    of ``tasks.datasets.FORMATS``, detected when None): streamed in this
+    process when ``workers`` is 0, else decoded by that many worker
+    processes. With ``resume``, start after the last batch committed by an
+    earlier import of the same file.
+    """
+    if batch_size is None:
+        batch_size = settings.TASKS_IMPORT_BATCH_SIZE
+    if fmt is None:
+        fmt = detect_format(path)
+    if workers and fmt == "csv":
+        raise DatasetError("--workers needs a JSON array or NDJSON file")
+
+    state = _checkpoint(path, fmt, resume)
+    if state.format != fmt:
+        raise DatasetError(f"the checkpoint of this file was read as {state.format}, not {fmt}")
+    if state.finished:
+        batches = []
+    elif workers:
+        batches = _parallel_batches(path, fmt, state.position, workers, batch_size, upsert)
+    else:
+        batches = _clean_batches(iter_rows(path, fmt, state.position), batch_size, upsert)
+    result = write_batches(batches, progress, upsert, state)
+    ImportState.objects.filter(id=state.id).update(finished=True)
+    return result
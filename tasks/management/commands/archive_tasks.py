@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import archive
+
+
+class Command(BaseCommand):
+    help = "Move completed tasks older than --days to the archive table, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=float,
+            default=settings.TASKS_ARCHIVE_AFTER_DAYS,
+            help="Archive tasks completed and unchanged for this many days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TASKS_ARCHIVE_BATCH_SIZE,
+            help="Tasks moved per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--days must be >= 0 and --batch-size >= 1.")
+
+        def progress(moved):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{moved} task(s) archived...")
+
+        moved = archive.archive_tasks(options["days"], options["batch_size"], progress)
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} task(s)."))
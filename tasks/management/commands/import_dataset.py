@@ -1,14 +1,18 @@
-import json
+import time
 from pathlib import Path
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
-from tasks.models import Task
+from tasks import importer
+from tasks.datasets import FORMATS, DatasetError
+
+# Seconds between two progress lines.
+PROGRESS_INTERVAL = 5
 
 
 class Command(BaseCommand):
-    help = "Import tasks from a JSON dataset file."
+    help = "Import tasks from a JSON, NDJSON or CSV dataset file."
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -17,30 +21,74 @@ class Command(BaseCommand):
             default=str(Path(settings.BASE_DIR) / "dataset.json"),
             help="Path to the dataset.json file",
         )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file (detected from its first character by default)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TASKS_IMPORT_BATCH_SIZE,
+            help="Tasks inserted per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Decode the file in this many processes (JSON or NDJSON, one element per line)",
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update the tasks imported before (matched on external_id or title) instead of duplicating them",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted import of the same file after its last committed batch",
+        )
 
     def handle(self, *args, **options):
         path = Path(options["path"])
 
         if not path.exists():
             raise CommandError(f"Dataset file not found: {path}")
+        if options["batch_size"] < 1 or options["workers"] < 0:
+            raise CommandError("--batch-size must be >= 1 and --workers >= 0.")
 
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as e:
-            raise CommandError(f"Invalid JSON file: {e}") from e
+        last_report = time.monotonic()
 
-        if not isinstance(data, list):
-            raise CommandError("dataset.json must contain a list of tasks")
+        def progress(result, elapsed):
+            nonlocal last_report
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                rate = (result.rows - result.resumed) / elapsed
+                self.stdout.write(f"{result.rows} row(s), {rate:.0f} rows/s...")
 
-        created = 0
-        for row in data:
-            title = row.get("title")
-            complete = bool(row.get("complete", False))
-
-            if not title:
-                continue
-
-            Task.objects.create(title=title, complete=complete)
-            created += 1
+        started = time.monotonic()
+        try:
+            result = importer.import_file(
+                path,
+                options["workers"],
+                options["batch_size"],
+                progress,
+                options["upsert"],
+                options["format"],
+                options["resume"],
+            )
+        except (DatasetError, UnicodeDecodeError) as e:
+            raise CommandError(f"Invalid dataset file: {e}") from e
+        elapsed = time.monotonic() - started
 
-        self.stdout.write(self.style.SUCCESS(f"Imported {created} task(s)."))
+        if result.resumed:
+            self.stdout.write(f"Resumed after {result.resumed} row(s) imported by an earlier run.")
+        elif options["resume"]:
+            self.stdout.write(self.style.WARNING("No checkpoint for this file: imported it from the start."))
+        if result.skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped {result.skipped} row(s) without a title."))
+        summary = f"Imported {result.imported} task(s)"
+        if options["upsert"]:
+            summary += f", updated {result.updated}, {result.unchanged} unchanged"
+        rate = (result.rows - result.resumed) / max(elapsed, 1e-6)
+        self.stdout.write(self.style.SUCCESS(f"{summary} in {elapsed:.1f}s ({rate:.0f} rows/s)."))
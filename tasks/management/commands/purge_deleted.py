@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import purge
+
+
+class Command(BaseCommand):
+    help = "Remove tasks deleted more than --days ago, in batches, then shrink the database file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=float,
+            default=settings.TASKS_PURGE_AFTER_DAYS,
+            help="Purge tasks deleted at least this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.TASKS_PURGE_BATCH_SIZE,
+            help="Rows deleted per transaction",
+        )
+        parser.add_argument(
+            "--no-vacuum",
+            action="store_true",
+            help="Leave the freed pages in the file",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--days must be >= 0 and --batch-size >= 1.")
+
+        def progress(purged):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{purged} task(s) purged...")
+
+        purged = purge.purge_deleted(options["days"], options["batch_size"], progress)
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} deleted task(s)."))
+
+        if purged and not options["no_vacuum"]:
+            before = purge.database_size()
+            statement = purge.reclaim_space()
+            if statement:
+                after = purge.database_size()
+                self.stdout.write(f"{statement}: {before} -> {after} bytes.")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from tasks import search
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of task titles."
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        count = Task.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} task(s)."))
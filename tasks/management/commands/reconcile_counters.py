@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from tasks import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the task counters from the task table and repair any drift."
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile()
+        for field, (stored, actual) in drift.items():
+            self.stdout.write(f"{field}: {stored} -> {actual}")
+        if drift:
+            self.stdout.write(self.style.WARNING("Counters repaired."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Counters are up to date."))
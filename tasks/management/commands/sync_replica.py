@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.routers import copy_to_replica
+
+
+class Command(BaseCommand):
+    help = "Copy the primary database to the read replica with the SQLite backup API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            type=str,
+            help="Replica file to write (default: the 'replica' database)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep copying every INTERVAL seconds (default: copy once)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path is None and settings.TASKS_REPLICA_DATABASE is None:
+            raise CommandError("No replica configured: set TODO_REPLICA_PATH or pass --path.")
+
+        while True:
+            started = time.monotonic()
+            copy_to_replica(path)
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f"Replica synced in {elapsed * 1000:.0f} ms."))
+            if not options["interval"]:
+                break
+            time.sleep(max(0, options["interval"] - elapsed))
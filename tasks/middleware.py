@@ -0,0 +1,108 @@
+"""
+Compression of dynamic responses.
+
+:class:`CompressionMiddleware` encodes response bodies with brotli or gzip,
+whichever the client accepts (brotli preferred, when installed). It leaves
+alone responses that gain nothing from it: bodies under
+``TASKS_COMPRESS_MIN_SIZE`` bytes, content types that are compressed
+already (images, archives, fonts...), event streams and responses that
+carry a ``Content-Encoding`` already, such as the precompressed static
+files of ``tasks.staticfiles``.
+
+Streaming responses (the NDJSON API) are compressed incrementally, sync or
+async, so memory stays constant whatever their length.
+
+CSRF tokens are masked with a fresh secret on every response, which is
+what keeps compressed pages safe from BREACH-style length attacks.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .compression import acompress_iterator, compress, compress_iterator, negotiate
+
+# Content types that are compressed already, or must reach the client
+# chunk by chunk (text/event-stream).
+SKIP_CONTENT_TYPES = (
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-bzip2",
+    "application/x-7z-compressed",
+    "application/pdf",
+    "application/octet-stream",
+    "text/event-stream",
+)
+COMPRESSIBLE_IMAGES = ("image/svg+xml",)
+
+
+def _compressible_type(content_type):
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in COMPRESSIBLE_IMAGES:
+        return True
+    return not content_type.startswith(SKIP_CONTENT_TYPES)
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not _compressible_type(response.get("Content-Type", "")):
+            return response
+        if "no-transform" in response.get("Cache-Control", ""):
+            return response
+        if not response.streaming and len(response.content) < settings.TASKS_COMPRESS_MIN_SIZE:
+            return response
+
+        # The body depends on Accept-Encoding from here on, compressed or not.
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoder = negotiate(request)
+        if encoder is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_iterator(
+                    encoder(), response.streaming_content
+                )
+            else:
+                response.streaming_content = compress_iterator(
+                    encoder(), response.streaming_content
+                )
+            # The compressed length is only known once streamed.
+            del response.headers["Content-Length"]
+        else:
+            content = compress(encoder(), response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        # The encoded body differs byte for byte: a strong ETag becomes weak
+        # (RFC 9110 8.8.1), which still matches in If-None-Match.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoder.coding
+        return response
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:40
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# Keep the single tasks_taskcounters row in step with tasks_task. Triggers
+# run inside the writing statement's transaction and see every write,
+# including bulk_create, queryset update()/delete() and raw SQL.
+CREATE_SQL = [
+    """
+    CREATE TRIGGER tasks_taskcounters_insert AFTER INSERT ON tasks_task BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total + 1,
+            complete = complete + new.complete,
+            priority = priority + new.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_delete AFTER DELETE ON tasks_task BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total - 1,
+            complete = complete - old.complete,
+            priority = priority - old.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_update AFTER UPDATE OF complete, priority ON tasks_task
+    WHEN new.complete != old.complete OR new.priority != old.priority BEGIN
+        UPDATE tasks_taskcounters
+        SET complete = complete + new.complete - old.complete,
+            priority = priority + new.priority - old.priority
+        WHERE id = 1;
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS tasks_taskcounters_update",
+    "DROP TRIGGER IF EXISTS tasks_taskcounters_delete",
+    "DROP TRIGGER IF EXISTS tasks_taskcounters_insert",
+]
+
+
+def create_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounters = apps.get_model('tasks', 'TaskCounters')
+    totals = Task.objects.aggregate(
+        total=Count('id'),
+        complete=Count('id', filter=Q(complete=True)),
+        priority=Count('id', filter=Q(priority=True)),
+    )
+    TaskCounters.objects.create(id=1, **totals)
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('complete', models.PositiveIntegerField(default=0)),
+                ('priority', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_counters, drop_triggers),
+    ]
@@ -0,0 +1,169 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:28
+
+from django.db import migrations, models
+
+# The counters (migration 0006) count live tasks only: tombstoning a task
+# (setting deleted_at) removes it from them, clearing deleted_at adds it
+# back, and purging a tombstone leaves them alone. Adding the nullable
+# column is an ALTER TABLE, so the triggers of 0005 and 0006 survive it.
+COUNTER_TRIGGERS = [
+    "tasks_taskcounters_insert",
+    "tasks_taskcounters_delete",
+    "tasks_taskcounters_update",
+]
+
+CREATE_SQL = [
+    """
+    CREATE TRIGGER tasks_taskcounters_insert AFTER INSERT ON tasks_task
+    WHEN new.deleted_at IS NULL BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total + 1,
+            complete = complete + new.complete,
+            priority = priority + new.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_delete AFTER DELETE ON tasks_task
+    WHEN old.deleted_at IS NULL BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total - 1,
+            complete = complete - old.complete,
+            priority = priority - old.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_update AFTER UPDATE OF complete, priority ON tasks_task
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NULL
+    AND (new.complete != old.complete OR new.priority != old.priority) BEGIN
+        UPDATE tasks_taskcounters
+        SET complete = complete + new.complete - old.complete,
+            priority = priority + new.priority - old.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_tombstone AFTER UPDATE OF deleted_at ON tasks_task
+    WHEN old.deleted_at IS NULL AND new.deleted_at IS NOT NULL BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total - 1,
+            complete = complete - old.complete,
+            priority = priority - old.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_restore AFTER UPDATE OF deleted_at ON tasks_task
+    WHEN old.deleted_at IS NOT NULL AND new.deleted_at IS NULL BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total + 1,
+            complete = complete + new.complete,
+            priority = priority + new.priority
+        WHERE id = 1;
+    END
+    """,
+]
+
+# The triggers of migration 0006, restored when unapplying.
+PREVIOUS_SQL = [
+    """
+    CREATE TRIGGER tasks_taskcounters_insert AFTER INSERT ON tasks_task BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total + 1,
+            complete = complete + new.complete,
+            priority = priority + new.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_delete AFTER DELETE ON tasks_task BEGIN
+        UPDATE tasks_taskcounters
+        SET total = total - 1,
+            complete = complete - old.complete,
+            priority = priority - old.priority
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_taskcounters_update AFTER UPDATE OF complete, priority ON tasks_task
+    WHEN new.complete != old.complete OR new.priority != old.priority BEGIN
+        UPDATE tasks_taskcounters
+        SET complete = complete + new.complete - old.complete,
+            priority = priority + new.priority - old.priority
+        WHERE id = 1;
+    END
+    """,
+]
+
+
+def _replace_triggers(schema_editor, drop, create):
+    if schema_editor.connection.vendor == 'sqlite':
+        for name in drop:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for statement in create:
+            schema_editor.execute(statement)
+
+
+def live_counter_triggers(apps, schema_editor):
+    _replace_triggers(schema_editor, COUNTER_TRIGGERS, CREATE_SQL)
+
+
+def previous_counter_triggers(apps, schema_editor):
+    _replace_triggers(
+        schema_editor,
+        [*COUNTER_TRIGGERS, "tasks_taskcounters_tombstone", "tasks_taskcounters_restore"],
+        PREVIOUS_SQL,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_archivedtask'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_priority_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_incomplete_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_priority_only_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_updated_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-priority', 'id'], name='task_priority_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('complete', False), ('deleted_at__isnull', True)), fields=['-priority', 'id'], name='task_incomplete_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('priority', True)), fields=['id'], name='task_priority_only_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['updated'], name='task_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='task_deleted_idx'),
+        ),
+        migrations.RunPython(live_counter_triggers, previous_counter_triggers),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='import_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('import_key__isnull', False)), fields=('import_key',), name='task_import_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:55
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# Adding the column rebuilds tasks_taskcounters, which SQLite refuses while
+# the counter triggers of migration 0008 point at it: they are dropped
+# first and created again with the version triggers.
+soft_delete = import_module('tasks.migrations.0008_task_soft_delete')
+COUNTER_TRIGGERS = [
+    *soft_delete.COUNTER_TRIGGERS,
+    "tasks_taskcounters_tombstone",
+    "tasks_taskcounters_restore",
+]
+
+# Every statement writing tasks_task, in any process, moves the version
+# of the cached task list (tasks.cache) in its own transaction. The new
+# value is at least the current time in microseconds, so that a database
+# restored from a backup, or a rolled back transaction, never brings back
+# a version whose fragments are still cached.
+NEXT_VERSION = (
+    "MAX(version + 1, CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER))"
+)
+
+CREATE_SQL = [
+    f"""
+    CREATE TRIGGER tasks_taskcounters_version_{event.lower()} AFTER {event} ON tasks_task BEGIN
+        UPDATE tasks_taskcounters SET version = {NEXT_VERSION} WHERE id = 1;
+    END
+    """
+    for event in ("INSERT", "UPDATE", "DELETE")
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS tasks_taskcounters_version_{event}"
+    for event in ("insert", "update", "delete")
+]
+
+
+def _execute(schema_editor, statements):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+def drop_counter_triggers(apps, schema_editor):
+    _execute(schema_editor, [f"DROP TRIGGER IF EXISTS {name}" for name in COUNTER_TRIGGERS])
+
+
+def create_counter_triggers(apps, schema_editor):
+    _execute(schema_editor, soft_delete.CREATE_SQL)
+
+
+def create_triggers(apps, schema_editor):
+    _execute(schema_editor, [*soft_delete.CREATE_SQL, *CREATE_SQL])
+
+
+def drop_triggers(apps, schema_editor):
+    drop_counter_triggers(apps, schema_editor)
+    _execute(schema_editor, DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_importstate'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_counter_triggers, create_counter_triggers),
+        migrations.AddField(
+            model_name='taskcounters',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -1,4 +1,53 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+
+from .rows import FIELDS as ROW_FIELDS
+
+
+class TaskQuerySet(models.QuerySet):
+	def rows(self):
+		"""The tasks as named rows of the ``TaskRow`` fields (see ``tasks.rows``)."""
+		return self.values_list(*ROW_FIELDS, named=True)
+
+	def delete(self):
+		"""
+		Soft-delete the tasks, like ``tasks.bulk.delete``: set ``deleted_at``
+		and keep the rows until ``purge_deleted`` removes them. Tasks already
+		deleted keep their ``deleted_at``. Returns ``(count, {label: count})``
+		like ``QuerySet.delete``.
+		"""
+		return self._soft_delete(timezone.now())
+
+	delete.queryset_only = True
+
+	def _soft_delete(self, now):
+		# tasks.events imports this module.
+		from .events import tasks_deleted
+
+		with transaction.atomic(using=self.db):
+			live = self.filter(deleted_at__isnull=True)
+			ids = list(live.values_list('id', flat=True))
+			count = live.update(deleted_at=now, updated=now)
+			if ids:
+				tasks_deleted(ids)
+		return count, {self.model._meta.label: count}
+
+	def hard_delete(self):
+		"""Remove the rows now, tombstones included: ``QuerySet.delete``."""
+		return super().delete()
+
+	hard_delete.queryset_only = True
+
+
+class LiveTaskManager(models.Manager.from_queryset(TaskQuerySet)):
+	"""
+	Default manager: the tasks that are not deleted. Deleting a task only
+	sets ``deleted_at`` (``Task.delete``, ``TaskQuerySet.delete`` and
+	``tasks.bulk.delete`` alike); ``Task.all_objects`` still sees it until
+	``purge_deleted`` removes the row.
+	"""
+	def get_queryset(self):
+		return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 # Create your models here.
@@ -7,7 +56,131 @@ class Task(models.Model):
 	complete = models.BooleanField(default=False)
 	created = models.DateTimeField(auto_now_add=True)
 	priority = models.BooleanField(default=False)
+	updated = models.DateTimeField(auto_now=True)
+	deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+	# Identity of a task created by import_dataset --upsert: a hash of the
+	# dataset's external id, or of the normalised title (tasks.datasets).
+	import_key = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+	objects = LiveTaskManager()
+	all_objects = TaskQuerySet.as_manager()
+
+	class Meta:
+		# The list indexes only cover live tasks (the default manager's
+		# deleted_at IS NULL): tombstones cost them nothing.
+		indexes = [
+			# Matches the home page ordering so the list is an index scan.
+			models.Index(
+				fields=['-priority', 'id'],
+				name='task_priority_id_idx',
+				condition=models.Q(deleted_at__isnull=True),
+			),
+			models.Index(
+				fields=['-priority', 'id'],
+				name='task_incomplete_idx',
+				condition=models.Q(complete=False, deleted_at__isnull=True),
+			),
+			models.Index(
+				fields=['id'],
+				name='task_priority_only_idx',
+				condition=models.Q(priority=True, deleted_at__isnull=True),
+			),
+			# Max('updated') drives conditional GET on the task list.
+			models.Index(
+				fields=['updated'],
+				name='task_updated_idx',
+				condition=models.Q(deleted_at__isnull=True),
+			),
+			# Tombstones, oldest first, for purge_deleted.
+			models.Index(
+				fields=['deleted_at'],
+				name='task_deleted_idx',
+				condition=models.Q(deleted_at__isnull=False),
+			),
+		]
+		constraints = [
+			# The ON CONFLICT target of import_dataset --upsert. Partial, so
+			# that tasks created any other way (NULL key) cost it nothing.
+			models.UniqueConstraint(
+				fields=['import_key'],
+				name='task_import_key_uniq',
+				condition=models.Q(import_key__isnull=False),
+			),
+		]
+
+	def __str__(self) -> str:
+		return self.title
+
+	def delete(self, using=None, keep_parents=False):
+		"""Soft-delete the task (see ``TaskQuerySet.delete``)."""
+		now = timezone.now()
+		result = Task.all_objects.using(using or self._state.db).filter(pk=self.pk)._soft_delete(now)
+		if result[0]:
+			self.deleted_at = self.updated = now
+		return result
+
+	def hard_delete(self, using=None, keep_parents=False):
+		"""Remove the row now (``Model.delete``)."""
+		return super().delete(using, keep_parents)
+
+
+class TaskCounters(models.Model):
+	"""
+	Totals of the task table, kept in a single row (pk=1) that triggers on
+	tasks_task update in the same transaction as each write (migration
+	0006). Read through ``tasks.counters``; ``reconcile_counters`` repairs it.
+
+	``version`` changes with every write to tasks_task (migration 0011):
+	it versions the cached task list (``tasks.cache``), for every process.
+	"""
+	total = models.PositiveIntegerField(default=0)
+	complete = models.PositiveIntegerField(default=0)
+	priority = models.PositiveIntegerField(default=0)
+	version = models.PositiveBigIntegerField(default=0)
+
+	@property
+	def open(self) -> int:
+		return self.total - self.complete
+
+	def __str__(self) -> str:
+		return f'{self.open} open, {self.complete} done, {self.priority} priority'
+
+
+class ArchivedTask(models.Model):
+	"""
+	A completed task moved out of ``Task`` by ``archive_tasks`` (see
+	``tasks.archive``), so that the table behind the home page stays small.
+	"""
+	task_id = models.BigIntegerField(help_text='Id the task had in the task table.')
+	title = models.CharField(max_length=200)
+	complete = models.BooleanField(default=True)
+	priority = models.BooleanField(default=False)
+	created = models.DateTimeField()
+	updated = models.DateTimeField()
+	archived = models.DateTimeField()
+
+	def __str__(self) -> str:
+		return self.title
+
 
+class ImportState(models.Model):
+	"""
+	Checkpoint of an import_dataset run over one file, identified by its
+	fingerprint (see ``tasks.importer``). Saved in the transaction of each
+	batch, so ``position`` is always the end of the last committed row:
+	``--resume`` reads the file from there.
+	"""
+	fingerprint = models.CharField(max_length=64, unique=True)
+	path = models.CharField(max_length=1024)
+	format = models.CharField(max_length=10)
+	position = models.BigIntegerField(default=0, help_text='Byte offset in the file after the last committed row.')
+	imported = models.PositiveBigIntegerField(default=0)
+	updated = models.PositiveBigIntegerField(default=0)
+	unchanged = models.PositiveBigIntegerField(default=0)
+	skipped = models.PositiveBigIntegerField(default=0)
+	finished = models.BooleanField(default=False)
+	started = models.DateTimeField(auto_now_add=True)
+	checkpointed = models.DateTimeField(auto_now=True)
 
 	def __str__(self) -> str:
-		return self.title
\ No newline at end of file
+		return f'{self.path} @ {self.position}'
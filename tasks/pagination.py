@@ -0,0 +1,143 @@
+"""
+Keyset (cursor) pagination for the task list.
+
+The list is ordered by ``(-priority, id)``. A cursor encodes the position
+of a row in that ordering, so fetching the next or previous page is a
+range scan starting at the cursor instead of an ``OFFSET`` that has to
+walk (and discard) every preceding row. Cursors stay valid while tasks
+are inserted or deleted around them.
+"""
+
+from dataclasses import dataclass
+
+ORDERING = ("-priority", "id")
+REVERSE_ORDERING = ("priority", "-id")
+
+
+@dataclass
+class Page:
+    tasks: list
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def make_cursor(priority, pk):
+    """Cursor for the row ``(priority, pk)``: ``"<priority>.<id>"``, e.g. ``"1.42"``."""
+    return f"{int(priority)}.{pk}"
+
+
+def encode_cursor(task):
+    return make_cursor(task.priority, task.id)
+
+
+def decode_cursor(value):
+    """Return ``(priority, id)`` for a cursor string, or None if invalid."""
+    try:
+        priority, pk = (int(part) for part in value.split("."))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if priority not in (0, 1) or pk < 0:
+        return None
+    return bool(priority), pk
+
+
+def _segment(queryset, priority, ordering):
+    # ``priority__in`` renders as ``priority IN (?)``; a plain ``priority=True``
+    # renders as a bare boolean expression that SQLite cannot use as the
+    # equality prefix of the (-priority, id) index.
+    return queryset.filter(priority__in=[priority]).order_by(*ordering)
+
+
+def following(queryset, key=None):
+    """
+    Querysets that, read one after the other, yield every row of
+    ``queryset`` following ``key`` in list order (all rows when ``key`` is
+    None). Each one is a single index range scan.
+    """
+    if key is None:
+        return [queryset.order_by(*ORDERING)]
+    priority, pk = key
+    querysets = [_segment(queryset, priority, ORDERING).filter(id__gt=pk)]
+    if priority:
+        querysets.append(_segment(queryset, False, ORDERING))
+    return querysets
+
+
+def preceding(queryset, key):
+    """Like :func:`following`, for the rows before ``key``, nearest first."""
+    priority, pk = key
+    querysets = [_segment(queryset, priority, REVERSE_ORDERING).filter(id__lt=pk)]
+    if not priority:
+        querysets.append(_segment(queryset, True, REVERSE_ORDERING))
+    return querysets
+
+
+def _take(querysets, limit):
+    rows = []
+    for segment in querysets:
+        rows += segment[: limit - len(rows)]
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+async def _atake(querysets, limit):
+    rows = []
+    for segment in querysets:
+        rows += [row async for row in segment[: limit - len(rows)]]
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def _before_page(rows, size):
+    has_more = len(rows) > size
+    rows = rows[:size]
+    rows.reverse()
+    return Page(
+        tasks=rows,
+        next_cursor=encode_cursor(rows[-1]),
+        prev_cursor=encode_cursor(rows[0]) if has_more else None,
+    )
+
+
+def _after_page(rows, size, from_cursor):
+    has_more = len(rows) > size
+    rows = rows[:size]
+    return Page(
+        tasks=rows,
+        next_cursor=encode_cursor(rows[-1]) if has_more else None,
+        prev_cursor=encode_cursor(rows[0]) if from_cursor and rows else None,
+    )
+
+
+def paginate(queryset, size, after=None, before=None):
+    """
+    Return the :class:`Page` of ``queryset`` following the ``after`` cursor
+    or preceding the ``before`` cursor (the first page when neither is set).
+
+    One extra row is fetched to know whether another page exists.
+    """
+    before_key = decode_cursor(before)
+    if before_key is not None:
+        rows = _take(preceding(queryset, before_key), size + 1)
+        if rows:
+            return _before_page(rows, size)
+        # Everything before the cursor is gone: show the first page.
+
+    after_key = decode_cursor(after) if before_key is None else None
+    rows = _take(following(queryset, after_key), size + 1)
+    return _after_page(rows, size, after_key is not None)
+
+
+async def apaginate(queryset, size, after=None, before=None):
+    """:func:`paginate` for async views, through the async ORM."""
+    before_key = decode_cursor(before)
+    if before_key is not None:
+        rows = await _atake(preceding(queryset, before_key), size + 1)
+        if rows:
+            return _before_page(rows, size)
+
+    after_key = decode_cursor(after) if before_key is None else None
+    rows = await _atake(following(queryset, after_key), size + 1)
+    return _after_page(rows, size, after_key is not None)
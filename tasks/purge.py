@@ -0,0 +1,103 @@
+"""
+Removal of deleted tasks.
+
+Deleting a task only leaves a tombstone (``deleted_at``, see
+``tasks.bulk`` and ``Task.delete``), so the request path never pays for
+removing the row, its index entries and its search entry.
+``purge_deleted`` does that later, for the tombstones older than
+``TASKS_PURGE_AFTER_DAYS``: until then a deletion can be undone by
+clearing ``deleted_at``. Outside of it, only an explicit
+``hard_delete()`` removes rows.
+
+Rows go ``TASKS_PURGE_BATCH_SIZE`` per transaction, oldest first through
+the ``task_deleted_idx`` partial index, so the write lock is only ever
+held for one bounded batch. The freed pages are then handed back to the
+file system (:func:`reclaim_space`).
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.transaction import TransactionManagementError
+from django.utils import timezone
+
+from .models import Task
+from .sqlite import quote_column, quote_table
+
+AUTO_VACUUM_NONE, AUTO_VACUUM_FULL, AUTO_VACUUM_INCREMENTAL = 0, 1, 2
+
+
+def purge_batch(cutoff, batch_size):
+    """Delete up to ``batch_size`` tombstones older than ``cutoff``; return how many."""
+    table = quote_table(Task)
+    sql = (
+        "DELETE FROM {table} WHERE {id} IN ("
+        "SELECT {id} FROM {table} WHERE {deleted_at} IS NOT NULL AND {deleted_at} < %s"
+        " ORDER BY {deleted_at} LIMIT %s)"
+    ).format(table=table, id=quote_column(Task, "id"), deleted_at=quote_column(Task, "deleted_at"))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [connection.ops.adapt_datetimefield_value(cutoff), batch_size])
+        return cursor.rowcount
+
+
+def purge_deleted(days=None, batch_size=None, progress=None):
+    """
+    Remove the tasks deleted more than ``days`` ago; return how many.
+    ``progress(purged_so_far)`` is called after each batch.
+    """
+    if days is None:
+        days = settings.TASKS_PURGE_AFTER_DAYS
+    if batch_size is None:
+        batch_size = settings.TASKS_PURGE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+    while True:
+        purged = purge_batch(cutoff, batch_size)
+        total += purged
+        if purged and progress is not None:
+            progress(total)
+        if purged < batch_size:
+            return total
+
+
+def database_size():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA page_count")
+        pages = cursor.fetchone()[0]
+        cursor.execute("PRAGMA page_size")
+        return pages * cursor.fetchone()[0]
+
+
+def free_pages():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA freelist_count")
+        return cursor.fetchone()[0]
+
+
+def reclaim_space():
+    """
+    Shrink the database file to its live pages. With ``auto_vacuum =
+    INCREMENTAL`` this only truncates the free pages (``incremental_vacuum``);
+    otherwise the file is rebuilt with ``VACUUM``, which also applies a
+    pending ``auto_vacuum`` change. Returns the statement that ran, if any.
+    """
+    if connection.vendor != "sqlite":
+        return None
+    if connection.in_atomic_block:
+        raise TransactionManagementError("VACUUM cannot run inside a transaction.")
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA auto_vacuum")
+        mode = cursor.fetchone()[0]
+        if mode == AUTO_VACUUM_INCREMENTAL:
+            statement = "PRAGMA incremental_vacuum"
+            # incremental_vacuum frees one page per step of the statement and
+            # execute() only steps it once: executescript() runs it to the end.
+            cursor.executescript(f"{statement};")
+        elif mode == AUTO_VACUUM_NONE:
+            statement = "VACUUM"
+            cursor.execute(statement)
+        else:
+            # auto_vacuum = FULL truncates the file at each commit already.
+            return None
+    return statement
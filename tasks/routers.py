@@ -0,0 +1,136 @@
+"""
+Routing of task reads to a read replica.
+
+When a replica database is configured (``TASKS_REPLICA_DATABASE``, see
+``TODO_REPLICA_PATH`` in the settings), GET and HEAD requests to views
+decorated with :func:`replica_reads` (the list and detail pages, the API
+reads) load tasks from it. Everything else uses the primary: writes,
+every query of a POST, and the other apps (sessions, auth...).
+
+:func:`copy_to_replica` (the ``sync_replica`` command) refreshes the replica
+file from the primary with the SQLite backup API; in between, it lags.
+So that a client always sees its own writes, any unsafe request pins it
+to the primary for ``TASKS_REPLICA_PIN_SECONDS`` through a cookie set by
+:class:`ReplicaPinMiddleware`.
+"""
+
+import functools
+import sqlite3
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.transaction import TransactionManagementError
+
+PIN_COOKIE = "tasks_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_reading_from_replica = ContextVar("tasks_reading_from_replica", default=False)
+
+
+def _replica_allowed(request):
+    return (
+        settings.TASKS_REPLICA_DATABASE is not None
+        and request.method in ("GET", "HEAD")
+        and PIN_COOKIE not in request.COOKIES
+    )
+
+
+def replica_reads(view):
+    """
+    Run ``view`` with task reads routed to the replica, unless the request
+    writes or its client is pinned to the primary. Put it above
+    ``condition()`` so that the validators are read from the same copy.
+    """
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            token = _reading_from_replica.set(_replica_allowed(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _reading_from_replica.reset(token)
+
+    else:
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            token = _reading_from_replica.set(_replica_allowed(request))
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _reading_from_replica.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """Send reads of ``tasks`` models to the replica inside :func:`replica_reads`."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "tasks" and _reading_from_replica.get():
+            return settings.TASKS_REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same rows.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a file copy of the primary (sync_replica).
+        return db != settings.TASKS_REPLICA_DATABASE
+
+
+class ReplicaPinMiddleware:
+    """Pin clients that just wrote to the primary, so they read their writes."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and settings.TASKS_REPLICA_DATABASE:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.TASKS_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def copy_to_replica(path=None):
+    """
+    Copy the primary database over the replica file (or ``path``) in one
+    backup step. Replica readers keep their snapshot until it completes.
+    """
+    if path is None:
+        path = connections[settings.TASKS_REPLICA_DATABASE].settings_dict["NAME"]
+    primary = connections["default"]
+    if primary.in_atomic_block:
+        # The backup would wait forever for this very transaction to end.
+        raise TransactionManagementError("Cannot copy to the replica inside a transaction.")
+    primary.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
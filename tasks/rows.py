@@ -0,0 +1,34 @@
+"""
+Compact read path for listing tasks.
+
+A list page only needs four columns of each task. ``Task.objects.rows()``
+fetches them with ``values_list(named=True)`` and :func:`task_rows`
+turns the fetched rows into :class:`TaskRow` tuples: no model instance
+is built, no ``__init__``/``from_db``/signal machinery runs per row, and
+attribute access is a tuple index lookup. Rows render through
+:func:`tasks.fragments.render_rows`.
+"""
+
+from typing import NamedTuple
+
+
+class TaskRow(NamedTuple):
+    """The columns of a task shown in the list, with the ``Task`` API the
+    row template uses: ``id``, ``title``, ``complete``, ``priority`` and
+    ``str()``."""
+
+    id: int
+    title: str
+    complete: bool
+    priority: bool
+
+    def __str__(self):
+        return self.title
+
+
+FIELDS = TaskRow._fields
+
+
+def task_rows(rows):
+    """The named rows of ``Task.objects.rows()`` as a list of :class:`TaskRow`."""
+    return list(map(TaskRow._make, rows))
@@ -0,0 +1,75 @@
+"""
+Full-text search over task titles.
+
+Titles are indexed by the SQLite FTS5 table ``tasks_task_fts`` (created in
+migration 0005), an external-content index kept in sync with
+``tasks_task`` by triggers, so every write path, ORM, bulk or raw SQL,
+updates it. Deleted tasks stay indexed until purged and are skipped.
+A search is one ``MATCH`` on the index ordered by its bm25 ``rank``,
+then one primary-key lookup for the matching rows: its cost depends on
+the number of matches, not on the size of the table.
+
+Every word of the query must appear in the title, the last one as a
+prefix: ``"buy mi"`` matches "Buy milk" while the user is still typing.
+"""
+
+import re
+
+from django.db import connection, connections, router
+
+from .models import Task
+from .rows import task_rows
+
+FTS_TABLE = "tasks_task_fts"
+
+_WORD = re.compile(r"\w+")
+
+
+def match_expression(query):
+    """
+    FTS5 query for the user input ``query``, or ``""`` when it holds no
+    word. Words are quoted so that FTS5 operators typed by the user
+    (``AND``, ``NEAR``, ``*``, ``"``...) are searched as plain text.
+    """
+    words = _WORD.findall(query)
+    if not words:
+        return ""
+    terms = ['"{}"'.format(word) for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _ranked_ids(expression, limit):
+    sql = (
+        "SELECT {0}.rowid FROM {0} JOIN {1} ON {1}.id = {0}.rowid"
+        " WHERE {0} MATCH %s AND {1}.deleted_at IS NULL"
+        " ORDER BY {0}.rank LIMIT %s"
+    ).format(FTS_TABLE, Task._meta.db_table)
+    # The index of the database the rows are read from (tasks.routers).
+    with connections[router.db_for_read(Task)].cursor() as cursor:
+        cursor.execute(sql, [expression, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search(query, limit, queryset=None):
+    """
+    The best ``limit`` tasks of ``queryset`` (``TaskRow`` tuples by
+    default) matching ``query``, best first.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+    ids = _ranked_ids(expression, limit)
+    rows = queryset is None
+    if rows:
+        queryset = Task.objects.rows()
+    found = {task.id: task for task in queryset.filter(id__in=ids)}
+    tasks = [found[pk] for pk in ids if pk in found]
+    return task_rows(tasks) if rows else tasks
+
+
+def rebuild():
+    """Re-index every title from ``tasks_task``, then merge the index b-trees."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
@@ -0,0 +1,42 @@
+"""
+Per-connection tuning of SQLite.
+
+SQLite keeps most of its settings per connection, so they are applied by
+a ``connection_created`` receiver each time Django opens one, from the
+``TASKS_SQLITE_PRAGMAS`` setting (empty in development; see
+``todo.settings_production``). Pragmas run in setting order: put
+``busy_timeout`` first so that switching the journal mode waits for other
+connections instead of failing.
+
+:func:`quote_table` and :func:`quote_column` name the tables and columns
+of a model in the raw SQL of ``tasks.bulk``, ``tasks.importer``,
+``tasks.archive`` and ``tasks.purge``.
+"""
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def quote_table(model):
+    """The quoted table of ``model``."""
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def quote_column(model, name):
+    """The quoted column of the field ``name`` of ``model``."""
+    return connection.ops.quote_name(model._meta.get_field(name).column)
+
+
+def apply_pragmas(connection, pragmas):
+    """Run ``PRAGMA name = value`` on ``connection`` for each item of ``pragmas``."""
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def tune_connection(sender, connection, **kwargs):
+    if connection.vendor == "sqlite" and settings.TASKS_SQLITE_PRAGMAS:
+        apply_pragmas(connection, settings.TASKS_SQLITE_PRAGMAS)
@@ -0,0 +1,91 @@
+"""
+Static files for production: content-hashed, precompressed, cached forever.
+
+:class:`CompressedManifestStaticFilesStorage` is the ``staticfiles``
+storage of ``todo.settings_production``. On top of the hashed copies
+written by ``ManifestStaticFilesStorage`` (``app.98b7fabc0641.css``),
+``collectstatic`` writes a gzip (``.gz``) and, when the ``brotli`` package
+is installed, a brotli (``.br``) variant of each text asset. A front
+server can send those as they are (nginx ``gzip_static``/``brotli_static``);
+:func:`serve` does the same when Django serves the files itself.
+"""
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.utils.functional import cached_property
+from django.views.static import serve as serve_file
+
+from .compression import (
+    STATIC_BROTLI_QUALITY,
+    STATIC_GZIP_LEVEL,
+    BrotliEncoder,
+    GzipEncoder,
+    accepts,
+    available_encoders,
+    compress,
+)
+
+COMPRESSIBLE = (".css", ".js", ".map", ".svg", ".txt", ".json", ".html", ".xml")
+
+# Hashed names never change content: one year, and no revalidation.
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+STATIC_LEVELS = {
+    BrotliEncoder: STATIC_BROTLI_QUALITY,
+    GzipEncoder: STATIC_GZIP_LEVEL,
+}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    @cached_property
+    def hashed_names(self):
+        """Content-hashed names listed in the manifest, safe to cache forever."""
+        return frozenset(self.hashed_files.values())
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if name.endswith(COMPRESSIBLE):
+                self._write_variants(name)
+
+    def _write_variants(self, name):
+        path = self.path(name)
+        with open(path, "rb") as source:
+            data = source.read()
+        for encoder in available_encoders():
+            compressed = compress(encoder(STATIC_LEVELS[encoder]), data)
+            # Not worth a variant unless it saves at least 5%.
+            if len(compressed) < len(data) * 0.95:
+                with open(path + encoder.suffix, "wb") as target:
+                    target.write(compressed)
+
+
+def serve(request, path):
+    """
+    Serve a collected static file from ``STATIC_ROOT``, as its ``.br`` or
+    ``.gz`` variant when the client accepts it. Content-hashed names are
+    marked immutable; other names must be revalidated.
+    """
+    root = settings.STATIC_ROOT
+    response = None
+    # Both variants are looked for: they may have been collected on a
+    # machine with brotli installed.
+    for encoder in (BrotliEncoder, GzipEncoder):
+        variant = path + encoder.suffix
+        if accepts(request, encoder.coding) and staticfiles_storage.exists(variant):
+            response = serve_file(request, variant, document_root=root)
+            break
+    if response is None:
+        response = serve_file(request, path, document_root=root)
+    response["Vary"] = "Accept-Encoding"
+    if path in getattr(staticfiles_storage, "hashed_names", ()):
+        response["Cache-Control"] = IMMUTABLE
+    else:
+        response["Cache-Control"] = "no-cache"
+    return response
@@ -1,11 +1,43 @@
+import asyncio
+import gzip
 import json
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import timedelta
+from io import StringIO
 from pathlib import Path
 
+from asgiref.sync import sync_to_async
+from django.apps import apps
 from django.conf import settings
-from django.core.management import call_command
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, router
+from django.template import engines
+from django.template.loader import get_template
+from django.test import (
+    AsyncRequestFactory,
+    Client,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-from tasks.models import Task
+from tasks import async_views, bulk, datasets, importer, purge, search, staticfiles
+from tasks.checks import check_async_middleware
+from tasks.counters import get_counters
+from tasks.events import broker
+from tasks.fragments import render_rows
+from tasks.models import ArchivedTask, ImportState, Task, TaskCounters
+from tasks.routers import PIN_COOKIE, replica_reads
+from tasks.rows import TaskRow, task_rows
 
 
 def tc(case_id):
@@ -164,3 +196,1172 @@ class TaskPriorityModelTests(TestCase):
             "Le champ priority devrait être False par défaut.",
         )
 
+
+@override_settings(TASKS_PAGE_SIZE=2)
+class PaginationTests(TestCase):
+    def setUp(self):
+        self.low = [Task.objects.create(title=f"Low {i}") for i in range(3)]
+        self.high = [Task.objects.create(title=f"High {i}", priority=True) for i in range(2)]
+
+    def walk(self, direction, cursor):
+        response = self.client.get("/", {direction: cursor})
+        self.assertEqual(response.status_code, 200)
+        return response.context["page"]
+
+    @tc("TC025")
+    def test_index_pages_follow_priority_order_without_offset(self):
+        """Les pages suivantes parcourent (-priority, id) sans OFFSET."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/")
+        self.assertFalse(any("OFFSET" in q["sql"] for q in queries.captured_queries))
+
+        page = response.context["page"]
+        seen = [t.title for t in page.tasks]
+        while page.next_cursor:
+            page = self.walk("after", page.next_cursor)
+            seen += [t.title for t in page.tasks]
+
+        self.assertEqual(seen, ["High 0", "High 1", "Low 0", "Low 1", "Low 2"])
+
+    @tc("TC026")
+    def test_cursors_are_stable_across_concurrent_inserts(self):
+        """Des écritures entre deux pages ne décalent ni ne dupliquent les tâches."""
+        first = self.client.get("/").context["page"]
+        self.high[0].delete()
+        Task.objects.create(title="Late low")
+
+        second = self.walk("after", first.next_cursor)
+        self.assertEqual([t.title for t in second.tasks], ["Low 0", "Low 1"])
+
+        back = self.walk("before", second.prev_cursor)
+        self.assertEqual([t.title for t in back.tasks], ["High 1"])
+        self.assertIsNone(back.prev_cursor)
+
+    @tc("TC027")
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Un curseur invalide affiche la première page."""
+        page = self.walk("after", "not-a-cursor")
+        self.assertEqual([t.title for t in page.tasks], ["High 0", "High 1"])
+
+
+class TaskIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def query_plans(self, path):
+        """Plans SQLite choisit pour les requêtes sur tasks_task émises par ``path``."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(path)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                if "ORDER BY" not in query["sql"]:
+                    continue
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plans.append(" | ".join(row[-1] for row in cursor.fetchall()))
+        return plans
+
+    @tc("TC028")
+    def test_list_queries_use_priority_index_without_sort(self):
+        """La home et ses pages suivantes utilisent l'index (-priority, id) sans tri temporaire."""
+        for path in ("/", "/?after=1.1", "/?after=0.1", "/?before=0.1"):
+            plans = self.query_plans(path)
+            self.assertTrue(plans, path)
+            for plan in plans:
+                self.assertIn("task_priority_id_idx", plan, path)
+                self.assertNotIn("TEMP B-TREE", plan, path)
+
+class TaskListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = Task.objects.create(title="Cached task")
+
+    @tc("TC029")
+    def test_cached_list_costs_no_query_but_form_is_fresh(self):
+        """Un second GET / sert la liste depuis le cache (seule la version est lue en SQL), avec un jeton CSRF."""
+        self.client.get("/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/")
+        self.assertNotIn("tasks", response.context)
+        self.assertContains(response, "Cached task")
+        self.assertContains(response, "csrfmiddlewaretoken")
+
+    @tc("TC030")
+    def test_task_writes_invalidate_cached_list(self):
+        """Créer, modifier ou supprimer une tâche invalide la liste en cache."""
+        self.client.get("/")
+
+        Task.objects.create(title="Fresh task")
+        self.assertContains(self.client.get("/"), "Fresh task")
+
+        self.task.title = "Renamed task"
+        self.task.save()
+        self.assertContains(self.client.get("/"), "Renamed task")
+
+        self.task.delete()
+        self.assertNotContains(self.client.get("/"), "Renamed task")
+
+    @tc("TC063")
+    def test_writes_outside_signals_invalidate_cached_list(self):
+        """La version de la liste est lue en base : les écritures hors signaux (SQL brut, autre processus) invalident le cache."""
+        self.assertContains(self.client.get("/"), "Cached task")
+        version = TaskCounters.objects.get(id=1).version
+
+        # What another process (import_dataset, archive_tasks, a shell)
+        # does: no signal, no cache call in this process.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO tasks_task (title, complete, priority, created, updated) "
+                "VALUES ('Raw task', 0, 0, '2026-01-01 00:00:00', '2026-01-01 00:00:00')"
+            )
+        self.assertGreater(TaskCounters.objects.get(id=1).version, version)
+        self.assertContains(self.client.get("/"), "Raw task")
+
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE tasks_task SET title = 'Raw renamed' WHERE title = 'Raw task'")
+        self.assertContains(self.client.get("/"), "Raw renamed")
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM tasks_task WHERE title = 'Raw renamed'")
+        self.assertNotContains(self.client.get("/"), "Raw renamed")
+
+    @tc("TC071")
+    def test_new_release_does_not_reuse_cached_fragments(self):
+        """Les clés du cache de la liste et de la recherche incluent APP_VERSION : une nouvelle version re-rend la liste."""
+        for url in ("/", "/?search=cached"):
+            self.client.get(url)
+            self.assertNotIn("tasks", self.client.get(url).context)
+            with override_settings(APP_VERSION="99.0.0"):
+                response = self.client.get(url)
+            self.assertIn("tasks", response.context)
+            self.assertContains(response, "Cached task")
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = Task.objects.create(title="Conditional task")
+
+    @tc("TC031")
+    def test_unchanged_list_returns_304_without_rendering(self):
+        """GET / avec If-None-Match inchangé répond 304 sans rendu, en une seule requête SQL."""
+        etag = self.client.get("/")["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        self.task.delete()
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @tc("TC064")
+    def test_list_etag_changes_after_out_of_process_write(self):
+        """L'ETag de la liste suit la version en base : une écriture hors processus (import_dataset, SQL brut) renvoie 200."""
+        etag = self.client.get("/")["ETag"]
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE tasks_task SET complete = 1 WHERE id = %s", [self.task.id])
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root, "dataset.json")
+            path.write_text(json.dumps([{"title": "Imported"}]), encoding="utf-8")
+            call_command("import_dataset", path=str(path), stdout=StringIO())
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Imported")
+        self.assertEqual(self.client.get("/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    @tc("TC070")
+    def test_etag_changes_when_the_csrf_secret_is_rotated(self):
+        """Les pages avec formulaire ne répondent plus 304 quand le secret CSRF change (connexion, cookie effacé)."""
+        User.objects.create_superuser("admin", password="secret")
+        etag = self.client.get("/")["ETag"]
+        self.assertEqual(self.client.get("/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        secret = self.client.cookies[settings.CSRF_COOKIE_NAME].value
+        response = self.client.post("/admin/login/", {"username": "admin", "password": "secret"})
+        self.assertEqual(response.status_code, 302)
+        self.assertNotEqual(self.client.cookies[settings.CSRF_COOKIE_NAME].value, secret)
+        response = self.client.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        url = f"/update_task/{self.task.id}/"
+        etag = self.client.get(url)["ETag"]
+        del self.client.cookies[settings.CSRF_COOKIE_NAME]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @tc("TC032")
+    def test_update_and_delete_pages_honour_last_modified(self):
+        """Les pages update/delete renvoient 304 tant que la tâche n'est pas modifiée."""
+        for url in (f"/update_task/{self.task.id}/", f"/delete_task/{self.task.id}/"):
+            first = self.client.get(url)
+            self.assertIn("ETag", first)
+            last_modified = first["Last-Modified"]
+
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(response.status_code, 304)
+
+        self.task.title = "Changed"
+        self.task.save()
+        response = self.client.get(
+            f"/update_task/{self.task.id}/", HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+
+class TaskApiTests(TestCase):
+    def setUp(self):
+        self.low = Task.objects.create(title="Low")
+        self.high = Task.objects.create(title="High", priority=True)
+        self.done = Task.objects.create(title="Done", complete=True)
+
+    def read_ndjson(self, response):
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        body = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    @tc("TC033")
+    def test_api_list_streams_ndjson_with_continuation_cursor(self):
+        """GET /api/tasks/ diffuse du NDJSON ordonné, reprenable via le curseur."""
+        rows = self.read_ndjson(self.client.get("/api/tasks/"))
+        self.assertEqual([r["title"] for r in rows], ["High", "Low", "Done"])
+
+        first = self.read_ndjson(self.client.get("/api/tasks/", {"limit": 1}))
+        self.assertEqual([r["title"] for r in first], ["High"])
+        rest = self.read_ndjson(
+            self.client.get("/api/tasks/", {"after": first[-1]["cursor"]})
+        )
+        self.assertEqual([r["title"] for r in rest], ["Low", "Done"])
+
+        response = self.client.get("/api/tasks/", {"after": "bogus"})
+        self.assertEqual(response.status_code, 400)
+
+    @tc("TC034")
+    def test_api_create_update_delete(self):
+        """POST, PATCH et DELETE sur l'API JSON créent, modifient et suppriment une tâche."""
+        response = self.client.post(
+            "/api/tasks/", {"title": "From API", "priority": True},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        created = response.json()
+        self.assertTrue(created["priority"])
+        self.assertFalse(created["complete"])
+
+        url = f"/api/tasks/{created['id']}/"
+        response = self.client.patch(url, {"complete": True}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        task = Task.objects.get(id=created["id"])
+        self.assertEqual((task.title, task.complete, task.priority), ("From API", True, True))
+
+        response = self.client.post("/api/tasks/", {"title": ""}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("title", response.json()["errors"])
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(Task.objects.filter(id=created["id"]).exists())
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+class BulkApiTests(TestCase):
+    def setUp(self):
+        self.tasks = [Task.objects.create(title=f"Bulk {i}") for i in range(3)]
+        self.ids = [t.id for t in self.tasks]
+
+    def bulk(self, payload):
+        return self.client.post("/api/tasks/bulk/", payload, content_type="application/json")
+
+    @tc("TC035")
+    def test_bulk_update_and_delete_run_as_single_queries(self):
+        """Les actions groupées font une seule requête SQL et renvoient un résultat par id."""
+        with self.assertNumQueries(1):
+            response = self.bulk({"action": "complete", "ids": self.ids + [999999]})
+        self.assertEqual(response.status_code, 200)
+        statuses = {r["id"]: r["status"] for r in response.json()["results"]}
+        self.assertEqual(statuses[999999], "not_found")
+        self.assertEqual(Task.objects.filter(complete=True).count(), 3)
+
+        self.bulk({"action": "prioritise", "ids": self.ids[:1]})
+        self.assertEqual(list(Task.objects.filter(priority=True)), self.tasks[:1])
+
+        with self.assertNumQueries(1):
+            response = self.bulk({"action": "delete", "ids": self.ids[1:]})
+        self.assertEqual(
+            [r["status"] for r in response.json()["results"]], ["deleted", "deleted"]
+        )
+        self.assertEqual(list(Task.objects.all()), self.tasks[:1])
+
+    @tc("TC036")
+    def test_bulk_create_reports_each_row(self):
+        """L'action create insère les tâches valides et signale les invalides."""
+        response = self.bulk({
+            "action": "create",
+            "tasks": [{"title": "One"}, {"title": ""}, {"title": "Two", "priority": True}],
+        })
+        results = response.json()["results"]
+        self.assertEqual([r["status"] for r in results], ["created", "invalid", "created"])
+        self.assertTrue(Task.objects.get(id=results[2]["id"]).priority)
+
+        self.assertEqual(self.bulk({"action": "explode", "ids": [1]}).status_code, 400)
+        self.assertEqual(self.bulk({"action": "delete", "ids": ["1"]}).status_code, 400)
+
+class ToggleTests(TestCase):
+    def setUp(self):
+        self.task = Task.objects.create(title="Toggle me")
+
+    def toggle(self, field, current):
+        return self.client.post(
+            f"/toggle_{field}/{self.task.id}/", {"current": current},
+            HTTP_ACCEPT="application/json",
+        )
+
+    @tc("TC037")
+    def test_toggle_flips_flag_with_a_single_update(self):
+        """POST /toggle_complete/<id>/ bascule le flag en une seule requête UPDATE."""
+        with self.assertNumQueries(1):
+            response = self.toggle("complete", "0")
+        self.assertEqual(response.json(), {"id": self.task.id, "complete": True})
+        self.task.refresh_from_db()
+        self.assertTrue(self.task.complete)
+
+        response = self.toggle("priority", "0")
+        self.assertEqual(response.json(), {"id": self.task.id, "priority": True})
+
+    @tc("TC038")
+    def test_toggle_with_stale_state_is_a_conflict(self):
+        """Un second clic avec l'ancien état ne rebascule pas le flag (409)."""
+        self.toggle("complete", "0")
+        response = self.toggle("complete", "0")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["complete"], True)
+
+        self.assertEqual(self.toggle("complete", "maybe").status_code, 400)
+        self.assertEqual(
+            self.client.post("/toggle_complete/999999/", {"current": "0"}).status_code, 404
+        )
+        self.assertEqual(self.client.get(f"/toggle_complete/{self.task.id}/").status_code, 405)
+
+class SyncOnlyMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    @tc("TC039")
+    async def test_async_views_list_create_update_delete(self):
+        """Les vues async (index, update, delete) passent par l'ORM async."""
+        request = self.factory.post("/", {"title": "Async task", "priority": "on"})
+        response = await async_views.index(request)
+        self.assertEqual(response.status_code, 302)
+        task = await Task.objects.aget(title="Async task")
+        self.assertTrue(task.priority)
+
+        request = self.factory.get("/")
+        response = await async_views.index(request)
+        self.assertContains(response, "Async task")
+        conditional = self.factory.get("/", headers={"If-None-Match": response["ETag"]})
+        # The CSRF secret CsrfViewMiddleware would read from the cookie.
+        conditional.META["CSRF_COOKIE"] = request.META["CSRF_COOKIE"]
+        not_modified = await async_views.index(conditional)
+        self.assertEqual(not_modified.status_code, 304)
+
+        url = f"/update_task/{task.id}/"
+        request = self.factory.post(url, {"title": "Async renamed", "complete": "on"})
+        response = await async_views.updateTask(request, task.id)
+        self.assertEqual(response.status_code, 302)
+        await task.arefresh_from_db()
+        self.assertEqual((task.title, task.complete), ("Async renamed", True))
+
+        response = await async_views.deleteTask(self.factory.post(url), task.id)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(await Task.objects.filter(id=task.id).aexists())
+
+    @tc("TC040")
+    def test_check_flags_sync_only_middleware_under_async_views(self):
+        """Le check tasks.W001 signale un middleware non async sous ASGI."""
+        self.assertEqual(check_async_middleware(None), [])
+        with override_settings(TASKS_ASYNC_VIEWS=True):
+            self.assertEqual(check_async_middleware(None), [])
+            middleware = settings.MIDDLEWARE + ["tasks.tests.SyncOnlyMiddleware"]
+            with override_settings(MIDDLEWARE=middleware):
+                errors = check_async_middleware(None)
+        self.assertEqual([e.id for e in errors], ["tasks.W001"])
+
+class LiveEventTests(TestCase):
+    def write(self, action):
+        """Écrit comme une vue sync (thread), en exécutant les callbacks on_commit."""
+        def run():
+            with self.captureOnCommitCallbacks(execute=True):
+                return action()
+        return sync_to_async(run)()
+
+    async def next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        event, data = chunk.strip().split("\n")
+        return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+    @tc("TC041")
+    async def test_event_stream_pushes_task_changes(self):
+        """Le flux SSE pousse création, modification et suppression des tâches."""
+        response = await async_views.taskEvents(AsyncRequestFactory().get("/events/"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = async_views._event_stream()
+        self.assertEqual(await anext(stream), "retry: 3000\n\n")
+        try:
+            task = await self.write(lambda: Task.objects.create(title="Live task"))
+            event, data = await self.next_event(stream)
+            self.assertEqual((event, data["id"]), ("created", task.id))
+            self.assertIn("Live task", data["html"])
+
+            task.title = "Live task renamed"
+            await self.write(task.save)
+            event, data = await self.next_event(stream)
+            self.assertEqual(event, "updated")
+            self.assertIn("Live task renamed", data["html"])
+
+            pk = task.id
+            await self.write(task.delete)
+            self.assertEqual(await self.next_event(stream), ("deleted", {"id": pk}))
+        finally:
+            await stream.aclose()
+        self.assertFalse(broker.has_subscribers)
+
+    @tc("TC072")
+    def test_publish_drops_subscribers_of_closed_loops(self):
+        """Un abonné dont la boucle d'événements est fermée est retiré sans faire échouer l'écriture."""
+        async def subscribe():
+            return broker.subscribe()
+
+        loop = asyncio.new_event_loop()
+        queue = loop.run_until_complete(subscribe())
+        loop.close()
+        self.addCleanup(broker.unsubscribe, queue)
+        self.assertTrue(broker.has_subscribers)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title="Written after shutdown")
+        self.assertFalse(broker.has_subscribers)
+        self.assertTrue(Task.objects.filter(title="Written after shutdown").exists())
+
+    @tc("TC042")
+    def test_event_stream_is_declined_under_wsgi(self):
+        """Sous WSGI, /events/ répond 204 : le navigateur ne se reconnecte pas."""
+        self.assertEqual(self.client.get("/events/").status_code, 204)
+
+class FragmentResponseTests(TestCase):
+    def setUp(self):
+        self.task = Task.objects.create(title="Row task")
+
+    def post(self, url, data=None):
+        return self.client.post(url, data or {}, HTTP_X_FRAGMENT="row")
+
+    def assertSingleRow(self, response, title):
+        html = response.content.decode()
+        self.assertEqual(html.count('class="item-row"'), 1)
+        self.assertNotIn("<html", html)
+        self.assertIn(title, html)
+
+    @tc("TC043")
+    def test_writes_return_row_fragments(self):
+        """Avec X-Fragment: row, création / modification renvoient la seule ligne concernée."""
+        response = self.post("/", {"title": "Fragment task", "priority": "on"})
+        self.assertEqual(response.status_code, 201)
+        self.assertSingleRow(response, "Fragment task")
+        self.assertIn('data-priority="1"', response.content.decode())
+
+        response = self.post(f"/update_task/{self.task.id}/", {"title": "Row renamed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertSingleRow(response, "Row renamed")
+
+        response = self.post(f"/toggle_complete/{self.task.id}/", {"current": "0"})
+        self.assertSingleRow(response, "<strike>Row renamed</strike>")
+
+        self.assertEqual(self.post("/", {"title": ""}).status_code, 400)
+
+    @tc("TC044")
+    def test_delete_fragment_request_returns_remove_instruction(self):
+        """Avec X-Fragment: row, la suppression renvoie 204 et l'id de la ligne à retirer."""
+        response = self.post(f"/delete_task/{self.task.id}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response["X-Task-Id"], str(self.task.id))
+        self.assertFalse(Task.objects.filter(id=self.task.id).exists())
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.milk = Task.objects.create(title="Buy milk")
+        self.more = Task.objects.create(title="Buy more milk and milk powder")
+        Task.objects.create(title="Call the bank")
+
+    def titles(self, response):
+        return [task.title for task in response.context["tasks"]]
+
+    @tc("TC045")
+    def test_search_ranked_prefix_matches(self):
+        """?search= renvoie les tâches correspondantes (préfixe, accents ignorés), les meilleures d'abord."""
+        response = self.client.get("/", {"search": "mil"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(response), ["Buy milk", "Buy more milk and milk powder"])
+        self.assertNotContains(response, "Call the bank")
+        self.assertEqual(self.titles(self.client.get("/", {"search": "BÁNK"})), ["Call the bank"])
+        # FTS5 syntax typed by the user is searched as plain text.
+        self.assertEqual(self.titles(self.client.get("/", {"search": 'milk"* ('})), [
+            "Buy milk", "Buy more milk and milk powder",
+        ])
+
+        response = self.client.get("/api/tasks/", {"search": "buy mi", "limit": 1})
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual([json.loads(line)["title"] for line in body.splitlines()], ["Buy milk"])
+
+    @tc("TC046")
+    def test_search_index_follows_writes_and_rebuild(self):
+        """L'index suit les écritures (y compris en masse) et rebuild_search_index le reconstruit."""
+        self.milk.title = "Buy bread"
+        self.milk.save()
+        Task.objects.filter(id=self.more.id).delete()
+        self.assertEqual(self.titles(self.client.get("/", {"search": "milk"})), [])
+        self.assertEqual(self.titles(self.client.get("/", {"search": "bread"})), ["Buy bread"])
+
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM tasks_task_fts")
+        call_command("rebuild_search_index", stdout=StringIO())
+        cache.clear()
+        self.assertEqual(self.titles(self.client.get("/", {"search": "bank"})), ["Call the bank"])
+
+class TaskCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def assertCounters(self, total, complete, priority):
+        counters = get_counters()
+        self.assertEqual(
+            (counters.total, counters.complete, counters.priority),
+            (total, complete, priority),
+        )
+
+    @tc("TC047")
+    def test_counters_follow_every_write_path(self):
+        """Les compteurs suivent créations, modifications, toggles, API bulk et import_dataset."""
+        task = Task.objects.create(title="One", priority=True)
+        Task.objects.create(title="Two", complete=True)
+        self.assertCounters(2, 1, 1)
+
+        task.complete = True
+        task.save()
+        self.client.post(f"/toggle_priority/{task.id}/", {"current": "1"})
+        self.assertCounters(2, 2, 0)
+
+        self.client.post(
+            "/api/tasks/bulk/", {"action": "create", "tasks": [{"title": "A"}, {"title": "B"}]},
+            content_type="application/json",
+        )
+        Task.objects.filter(complete=True).delete()
+        self.assertCounters(2, 0, 0)
+
+        dataset = json.loads((Path(settings.BASE_DIR) / "dataset.json").read_text(encoding="utf-8"))
+        call_command("import_dataset", stdout=StringIO())
+        done = sum(1 for row in dataset if row.get("title") and row.get("complete"))
+        self.assertCounters(Task.objects.count(), done, 0)
+
+        self.assertContains(
+            self.client.get("/"), f"{Task.objects.count() - done} open, {done} done, 0 priority"
+        )
+
+    @tc("TC048")
+    def test_reconcile_counters_repairs_drift(self):
+        """reconcile_counters recalcule les compteurs à partir de la table des tâches."""
+        Task.objects.create(title="Open")
+        Task.objects.create(title="Done", complete=True, priority=True)
+        TaskCounters.objects.filter(id=1).update(total=40, complete=0)
+
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("total: 40 -> 2", out.getvalue())
+        self.assertCounters(2, 1, 1)
+
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("up to date", out.getvalue())
+
+class TaskRowTests(TestCase):
+    @tc("TC049")
+    def test_rows_render_like_the_row_template(self):
+        """Task.objects.rows() renvoie des TaskRow, rendues à l'identique du gabarit task_row.html."""
+        Task.objects.create(title='<b>"Quoted" & co</b>', priority=True)
+        Task.objects.create(title="Done {0} {title}", complete=True)
+        Task.objects.create(title="Plain")
+
+        rows = task_rows(Task.objects.rows().order_by("id"))
+        self.assertIsInstance(rows[0], TaskRow)
+        self.assertEqual(str(rows[2]), "Plain")
+
+        template = get_template("tasks/task_row.html")
+        expected = "".join(template.render({"task": task}) for task in Task.objects.order_by("id"))
+        self.assertEqual(render_rows(rows), expected)
+
+        cache.clear()
+        response = self.client.get("/")
+        self.assertTrue(all(isinstance(task, TaskRow) for task in response.context["tasks"]))
+
+    @tc("TC069")
+    async def test_rows_chain_and_iterate_asynchronously(self):
+        """Task.objects.rows() se chaîne (filter, order_by, tranche, values_list) et s'itère avec l'ORM async."""
+        first = await Task.objects.acreate(title="First", priority=True)
+        second = await Task.objects.acreate(title="Second", complete=True)
+        await Task.objects.acreate(title="Third", priority=True)
+
+        rows = Task.objects.rows().filter(priority=True).exclude(title="Third").order_by("-id")
+        self.assertEqual([row async for row in rows], [(first.id, "First", False, True)])
+        rows = [row async for row in Task.objects.filter(id__gt=first.id).rows().order_by("-id")[1:]]
+        self.assertEqual(task_rows(rows), [TaskRow(second.id, "Second", True, False)])
+        self.assertEqual(str(task_rows(rows)[0]), "Second")
+        self.assertEqual(await Task.objects.rows().order_by("id").values_list("title", flat=True).afirst(), "First")
+
+class TemplateProfileTests(TestCase):
+    @tc("TC050")
+    def test_pages_share_static_css_and_templates_warm_up(self):
+        """Les pages utilisent la feuille tasks/app.css (plus de <style>) et les gabarits se préchargent."""
+        task = Task.objects.create(title="Styled")
+        cache.clear()
+        for url in ("/", f"/update_task/{task.id}/", f"/delete_task/{task.id}/"):
+            response = self.client.get(url)
+            self.assertContains(response, "/static/tasks/app.css")
+            self.assertNotContains(response, "<style>")
+
+        loader = engines["django"].engine.template_loaders[0]
+        loader.reset()
+        apps.get_app_config("tasks").warm_templates()
+        for name in ("list.html", "task_list.html", "task_row.html", "update_task.html", "delete.html"):
+            self.assertIn(f"tasks/{name}", loader.get_template_cache)
+
+class StaticAssetTests(TestCase):
+    @tc("TC051")
+    def test_collectstatic_writes_compressed_variants_served_immutable(self):
+        """collectstatic écrit des variantes .gz des fichiers hachés, servies avec un cache long."""
+        self.assertContains(self.client.get("/"), "/static/tasks/vendor/bootstrap/bootstrap.min.css")
+
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root,
+            STORAGES={
+                **settings.STORAGES,
+                "staticfiles": {"BACKEND": "tasks.staticfiles.CompressedManifestStaticFilesStorage"},
+            },
+        ):
+            call_command("collectstatic", interactive=False, ignore_patterns=["admin"], verbosity=0)
+            hashed = staticfiles_storage.stored_name("tasks/app.css")
+            self.assertNotEqual(hashed, "tasks/app.css")
+            with gzip.open(Path(root, hashed + ".gz")) as variant:
+                self.assertEqual(variant.read(), Path(root, hashed).read_bytes())
+
+            factory = RequestFactory()
+            response = staticfiles.serve(factory.get("/", HTTP_ACCEPT_ENCODING="gzip"), hashed)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(response["Content-Type"], "text/css")
+            self.assertEqual(response["Cache-Control"], staticfiles.IMMUTABLE)
+            self.assertEqual(response["Vary"], "Accept-Encoding")
+            response.close()
+
+            response = staticfiles.serve(factory.get("/"), "tasks/app.css")
+            self.assertNotIn("Content-Encoding", response)
+            self.assertEqual(response["Cache-Control"], "no-cache")
+            response.close()
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Task.objects.bulk_create(Task(title=f"Compressed task {i}") for i in range(30))
+
+    @tc("TC052")
+    def test_responses_compressed_by_accept_encoding(self):
+        """Les réponses volumineuses (et en flux) sont compressées selon Accept-Encoding, pas les petites."""
+        response = self.client.get("/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn(b"Compressed task 29", gzip.decompress(response.content))
+
+        response = self.client.get("/", HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        response = self.client.get("/api/tasks/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        lines = gzip.decompress(b"".join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 30)
+
+        task = Task.objects.first()
+        response = self.client.get(f"/api/tasks/{task.id}/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+
+class SqlitePragmaTests(TestCase):
+    @tc("TC053")
+    def test_new_connections_get_configured_pragmas(self):
+        """Chaque nouvelle connexion SQLite reçoit les PRAGMA de TASKS_SQLITE_PRAGMAS."""
+        pragmas = {"busy_timeout": 2500, "synchronous": "NORMAL", "cache_size": -4096, "temp_store": "MEMORY"}
+        expected = {"busy_timeout": 2500, "synchronous": 1, "cache_size": -4096, "temp_store": 2}
+        with override_settings(TASKS_SQLITE_PRAGMAS=pragmas):
+            fresh = connections.create_connection("default")
+            self.addCleanup(fresh.close)
+            with fresh.cursor() as cursor:
+                for name, value in expected.items():
+                    cursor.execute(f"PRAGMA {name}")
+                    self.assertEqual(cursor.fetchone()[0], value, name)
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertNotEqual(cursor.fetchone()[0], 2500)
+
+class SoftDeleteTests(TestCase):
+    @tc("TC056")
+    def test_deleted_tasks_become_tombstones(self):
+        """La suppression pose deleted_at : tâche masquée partout, compteurs à jour, restauration possible."""
+        kept = Task.objects.create(title="Kept milk")
+        task = Task.objects.create(title="Deleted milk", complete=True, priority=True)
+
+        self.client.post(f"/delete_task/{task.id}/")
+        self.assertFalse(Task.objects.filter(id=task.id).exists())
+        tombstone = Task.all_objects.get(id=task.id)
+        self.assertIsNotNone(tombstone.deleted_at)
+        counters = get_counters()
+        self.assertEqual((counters.total, counters.complete, counters.priority), (1, 0, 0))
+
+        cache.clear()
+        self.assertNotContains(self.client.get("/"), "Deleted milk")
+        self.assertEqual([row.id for row in search.search("milk", 10)], [kept.id])
+        self.assertEqual(bulk.update("complete", [task.id]), [{"id": task.id, "status": "not_found"}])
+        self.assertEqual(self.client.delete(f"/api/tasks/{task.id}/").status_code, 404)
+
+        Task.all_objects.filter(id=task.id).update(deleted_at=None)
+        counters = get_counters()
+        self.assertEqual((counters.total, counters.complete, counters.priority), (2, 1, 1))
+
+    @tc("TC073")
+    def test_model_queryset_and_admin_deletes_are_soft(self):
+        """Task.delete(), QuerySet.delete() et l'action de l'admin posent deleted_at ; seul hard_delete() supprime la ligne."""
+        one, two, three, four = (Task.objects.create(title=f"Task {i}") for i in range(4))
+
+        self.assertEqual(one.delete(), (1, {"tasks.Task": 1}))
+        self.assertIsNotNone(one.deleted_at)
+        self.assertEqual(Task.objects.filter(id__in=[one.id, two.id]).delete(), (1, {"tasks.Task": 1}))
+        User.objects.create_superuser("admin", password="secret")
+        self.client.login(username="admin", password="secret")
+        response = self.client.post(
+            "/admin/tasks/task/", {"action": "delete_selected", "_selected_action": [three.id], "post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+
+        deleted = Task.all_objects.filter(deleted_at__isnull=False)
+        self.assertEqual(set(deleted.values_list("id", flat=True)), {one.id, two.id, three.id})
+        self.assertEqual(list(Task.objects.values_list("id", flat=True)), [four.id])
+        self.assertEqual(get_counters().total, 1)
+
+        self.assertEqual(deleted.hard_delete()[0], 3)
+        four.hard_delete()
+        self.assertFalse(Task.all_objects.exists())
+
+class StreamingImportTests(TestCase):
+    @tc("TC058")
+    def test_json_array_streamed_and_inserted_in_batches(self):
+        """import_dataset lit le tableau JSON par morceaux et insère par lots (bulk_create), lignes invalides ignorées."""
+        rows = [
+            {"title": "Comma, [bracket] and \"quote\"", "complete": True},
+            {"title": "Unicode ✓ tâche", "extra": {"nested": [1, 2.5e3, None]}},
+            12345,
+            {"complete": True},
+            {"title": "Last", "complete": False},
+        ]
+        text = json.dumps(rows, ensure_ascii=False, indent=2)
+        for read_size in (1, 7, 4096):
+            self.assertEqual(list(datasets.iter_json_array(StringIO(text), read_size)), rows)
+        self.assertEqual(list(datasets.iter_json_array(StringIO(" [ ] "))), [])
+        numbers = "[-2500.0, 1e5, 2.5E-3, 7]"
+        for read_size in (1, 2, 6):
+            self.assertEqual(list(datasets.iter_json_array(StringIO(numbers), read_size)), [-2500.0, 1e5, 2.5e-3, 7])
+        for invalid in ('{"title": "x"}', '[{"title": "x"} {"title": "y"}]', '[{"title": "x"', "[1] 2"):
+            with self.assertRaises(datasets.DatasetError):
+                list(datasets.iter_json_array(StringIO(invalid), 3))
+
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root, "dataset.json")
+            path.write_text(text, encoding="utf-8")
+            out = StringIO()
+            with CaptureQueriesContext(connection) as queries:
+                call_command("import_dataset", path=str(path), batch_size=2, stdout=out)
+        inserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "tasks_task"')]
+        self.assertEqual(len(inserts), 2)
+        self.assertIn("Skipped 2 row(s)", out.getvalue())
+        self.assertIn("Imported 3 task(s)", out.getvalue())
+        self.assertEqual(
+            list(Task.objects.order_by("id").values_list("title", "complete")),
+            [("Comma, [bracket] and \"quote\"", True), ("Unicode ✓ tâche", False), ("Last", False)],
+        )
+
+class ParallelImportTests(TestCase):
+    @tc("TC059")
+    def test_workers_decode_byte_ranges_for_a_single_writer(self):
+        """import_dataset --workers découpe le fichier en plages d'octets décodées en parallèle, un seul écrivain."""
+        rows = [{"title": f"Parallel {i}", "complete": i % 2 == 0} for i in range(50)] + [{"title": ""}]
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root, "dataset.json")
+            path.write_text("[\n" + ",\n".join(json.dumps(row) for row in rows) + "\n]\n", encoding="utf-8")
+
+            ranges = list(datasets.split_points(path, chunk_size=100))
+            self.assertGreater(len(ranges), 5)
+            self.assertEqual((ranges[0][0], ranges[-1][1]), (0, path.stat().st_size))
+            batches = [batch for start, end in ranges for batch in datasets.parse_range(path, start, end, 7)]
+            self.assertEqual([row for fields, _, _ in batches for row in fields], [datasets.clean_row(row) for row in rows[:50]])
+            self.assertEqual(sum(skipped for _, skipped, _ in batches), 1)
+            self.assertLessEqual(max(len(fields) for fields, _, _ in batches), 7)
+            self.assertEqual(batches[-1][2], path.stat().st_size)
+
+            out = StringIO()
+            call_command("import_dataset", path=str(path), workers=2, batch_size=20, stdout=out)
+            self.assertIn("Imported 50 task(s)", out.getvalue())
+            self.assertEqual(list(Task.objects.order_by("id").values_list("title", flat=True)), [row["title"] for row in rows[:50]])
+
+            path.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+            with self.assertRaisesMessage(CommandError, "one element per line"):
+                call_command("import_dataset", path=str(path), workers=2, stdout=StringIO())
+
+class UpsertImportTests(TestCase):
+    @tc("TC060")
+    def test_upsert_reimport_only_writes_changed_rows(self):
+        """import_dataset --upsert : une réimportation ne crée pas de doublons et ne modifie que les lignes changées."""
+        def run(rows, **options):
+            path.write_text(json.dumps(rows), encoding="utf-8")
+            out = StringIO()
+            call_command("import_dataset", path=str(path), upsert=True, stdout=out, **options)
+            return out.getvalue()
+
+        rows = [
+            {"external_id": "a-1", "title": "Alpha"},
+            {"title": "Beta"},
+            {"title": "Gamma", "complete": True},
+        ]
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root, "dataset.json")
+            self.assertIn("Imported 3 task(s), updated 0, 0 unchanged", run(rows))
+            before = dict(Task.objects.values_list("title", "updated"))
+
+            self.assertIn("Imported 0 task(s), updated 0, 3 unchanged", run(rows))
+            self.assertEqual(dict(Task.objects.values_list("title", "updated")), before)
+
+            gamma = Task.objects.get(title="Gamma")
+            bulk.delete([gamma.id])
+            rows[0]["title"] = "Alpha v2"
+            rows[1] = {"title": "  BETA ", "complete": True}
+            rows.append({"title": "Delta"})
+            rows.append({"external_id": "a-1", "title": "Alpha v3"})
+            self.assertIn("Imported 1 task(s), updated 2, 1 unchanged", run(rows, batch_size=10))
+
+        self.assertEqual(
+            list(Task.objects.order_by("id").values_list("title", "complete")),
+            [("Alpha v3", False), ("  BETA ", True), ("Delta", False)],
+        )
+        self.assertTrue(Task.all_objects.filter(id=gamma.id, deleted_at__isnull=False).exists())
+        self.assertEqual(Task.all_objects.exclude(import_key=None).count(), 4)
+        self.assertEqual((get_counters().total, get_counters().complete), (3, 1))
+        self.assertEqual(search.search("alpha", 10, Task.objects.all())[0].title, "Alpha v3")
+
+    @tc("TC068")
+    def test_upsert_only_updates_the_fields_a_row_has(self):
+        """import_dataset --upsert ne met à jour que les champs présents dans la ligne (priorité conservée sans colonne)."""
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root, "dataset.ndjson")
+            path.write_text(
+                '{"title": "Alpha", "priority": true}\n{"title": "Beta", "complete": true, "priority": true}\n',
+                encoding="utf-8",
+            )
+            call_command("import_dataset", path=str(path), upsert=True, stdout=StringIO())
+            path = Path(root, "dataset.csv")
+            path.write_text("title,complete\nAlpha,yes\nBeta,yes\nGamma,no\n", encoding="utf-8")
+            out = StringIO()
+            call_command("import_dataset", path=str(path), upsert=True, stdout=out)
+        self.assertIn("Imported 1 task(s), updated 1, 1 unchanged", out.getvalue())
+        self.assertEqual(
+            list(Task.objects.order_by("id").values_list("title", "complete", "priority")),
+            [("Alpha", True, True), ("Beta", True, True), ("Gamma", False, False)],
+        )
+
+    @tc("TC074")
+    def test_upsert_counts_a_repeated_key_once(self):
+        """import_dataset --upsert : une clé répétée dans un lot compte une seule fois (la dernière ligne l'emporte)."""
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root, "dataset.ndjson")
+
+            def run(*rows):
+                path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+                out = StringIO()
+                call_command("import_dataset", path=str(path), upsert=True, stdout=out)
+                return out.getvalue()
+
+            self.assertIn(
+                "Imported 2 task(s), updated 0, 0 unchanged",
+                run({"external_id": 1, "title": "First"}, {"external_id": 1, "title": "Second"}, {"title": "Other"}),
+            )
+            self.assertIn(
+                "Imported 0 task(s), updated 1, 1 unchanged",
+                run({"external_id": 1, "title": "Second"}, {"external_id": 1, "title": "Third"}, {"title": "Other"}),
+            )
+        self.assertEqual(sorted(Task.objects.values_list("title", flat=True)), ["Other", "Third"])
+
+class ImportFormatTests(TestCase):
+    @tc("TC061")
+    def test_ndjson_and_csv_detected_and_read_from_a_memory_map(self):
+        """import_dataset détecte JSON, NDJSON et CSV, lit NDJSON et CSV ligne à ligne (mmap) et importe la priorité."""
+        ndjson = '{"title": "Nd one", "priority": true}\n\n{"title": "Nd two", "complete": true}'
+        text = '\ufefftitle,complete,priority\n"Comma, and\nnewline",yes,0\nPlain,false,TRUE\n,1,1\n'
+        with tempfile.TemporaryDirectory() as root:
+            paths = {name: Path(root, name) for name in ("tasks.json", "tasks.ndjson", "tasks.csv", "empty.csv")}
+            paths["tasks.json"].write_text(' [{"title": "Json", "priority": 1}]', encoding="utf-8")
+            paths["tasks.ndjson"].write_text(ndjson, encoding="utf-8")
+            paths["tasks.csv"].write_text(text, encoding="utf-8")
+            paths["empty.csv"].write_text("name\nx\n", encoding="utf-8")
+            self.assertEqual(
+                [datasets.detect_format(path) for path in paths.values()], ["json", "ndjson", "csv", "csv"]
+            )
+            self.assertEqual(
+                list(datasets.iter_lines(paths["tasks.ndjson"]))[-1],
+                (b'{"title": "Nd two", "complete": true}', len(ndjson)),
+            )
+
+            out = StringIO()
+            for name in ("tasks.json", "tasks.ndjson", "tasks.csv"):
+                call_command("import_dataset", path=str(paths[name]), stdout=out)
+            self.assertIn("Skipped 1 row(s)", out.getvalue())
+            with self.assertRaisesMessage(CommandError, "no 'title' column"):
+                call_command("import_dataset", path=str(paths["empty.csv"]), stdout=StringIO())
+            with self.assertRaisesMessage(CommandError, "--workers needs a JSON array or NDJSON file"):
+                call_command("import_dataset", path=str(paths["tasks.csv"]), workers=2, stdout=StringIO())
+            call_command("import_dataset", path=str(paths["tasks.ndjson"]), workers=2, stdout=StringIO())
+
+        self.assertEqual(
+            list(Task.objects.order_by("id").values_list("title", "complete", "priority")),
+            [
+                ("Json", False, True),
+                ("Nd one", False, True),
+                ("Nd two", True, False),
+                ("Comma, and\nnewline", True, False),
+                ("Plain", False, True),
+                ("Nd one", False, True),
+                ("Nd two", True, False),
+            ],
+        )
+
+    @tc("TC067")
+    def test_json_with_a_byte_order_mark(self):
+        """Un tableau JSON précédé d'une marque d'ordre des octets (BOM) est importé et repris au bon octet."""
+        text = '\ufeff[{"title": "Bom \u00e9"},\n {"title": "Bom two"}]'
+        with tempfile.TemporaryDirectory() as root:
+            path = Path(root, "tasks.json")
+            path.write_text(text, encoding="utf-8")
+            data = path.read_bytes()
+            rows = list(datasets.iter_rows(path, "json"))
+            self.assertEqual([row["title"] for row, _ in rows], ["Bom \u00e9", "Bom two"])
+            self.assertEqual(data[rows[0][1]:], b',\n {"title": "Bom two"}]')
+            self.assertEqual(list(datasets.iter_rows(path, "json", rows[0][1])), rows[1:])
+
+            call_command("import_dataset", path=str(path), stdout=StringIO())
+            call_command("import_dataset", path=str(path), workers=2, stdout=StringIO())
+        self.assertEqual(
+            list(Task.objects.order_by("id").values_list("title", flat=True)),
+            ["Bom \u00e9", "Bom two"] * 2,
+        )
+
+class Interrupted(Exception):
+    pass
+
+
+class ResumableImportTests(TestCase):
+    @tc("TC062")
+    def test_resume_continues_after_last_committed_batch(self):
+        """import_dataset --resume reprend après le dernier lot validé (point de contrôle : empreinte du fichier + position)."""
+        def interrupt_after(batches):
+            def progress(result, elapsed):
+                nonlocal batches
+                batches -= 1
+                if not batches:
+                    raise Interrupted
+            return progress
+
+        rows = [{"title": f"Row {i} ✓", "complete": i % 2 == 0} for i in range(23)]
+        files = {
+            "tasks.json": json.dumps(rows, ensure_ascii=False, indent=2),
+            "tasks.ndjson": "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows),
+            "tasks.csv": "title,complete\n" + "".join(f'"{row["title"]}\nbis",{row["complete"]}\n' for row in rows),
+        }
+        with tempfile.TemporaryDirectory() as root:
+            for name, text in files.items():
+                path = Path(root, name)
+                path.write_text(text, encoding="utf-8")
+                titles = [row["title"] + ("\nbis" if name == "tasks.csv" else "") for row in rows]
+                for workers in (0, 2) if name == "tasks.ndjson" else (0,):
+                    Task.all_objects.all().hard_delete()
+                    with self.assertRaises(Interrupted):
+                        importer.import_file(path, workers, batch_size=5, progress=interrupt_after(2))
+                    state = ImportState.objects.get(fingerprint=datasets.fingerprint(path))
+                    self.assertEqual((state.imported, state.finished), (10, False))
+                    self.assertEqual(Task.objects.count(), 10)
+
+                    out = StringIO()
+                    call_command("import_dataset", path=str(path), batch_size=5, workers=workers, resume=True, stdout=out)
+                    self.assertIn("Resumed after 10 row(s)", out.getvalue())
+                    self.assertIn("Imported 23 task(s)", out.getvalue())
+                    self.assertEqual(list(Task.objects.order_by("id").values_list("title", flat=True)), titles)
+
+            call_command("import_dataset", path=str(path), resume=True, stdout=StringIO())
+            self.assertEqual(Task.objects.count(), 23)
+            self.assertTrue(ImportState.objects.get(fingerprint=datasets.fingerprint(path)).finished)
+
+            path.write_text(text + '"Added",false\n', encoding="utf-8")
+            out = StringIO()
+            call_command("import_dataset", path=str(path), resume=True, stdout=out)
+            self.assertIn("No checkpoint for this file", out.getvalue())
+
+class ReplicaRoutingTests(TransactionTestCase):
+    @tc("TC054")
+    def test_reads_go_to_replica_until_client_writes(self):
+        """Les GET lisent le réplica, sauf après un POST (cookie d'épinglage) ; sync_replica copie la base."""
+        view = replica_reads(lambda request: (router.db_for_read(Task), router.db_for_read(Session)))
+        factory = RequestFactory()
+        with override_settings(TASKS_REPLICA_DATABASE="replica"):
+            self.assertEqual(view(factory.get("/")), ("replica", "default"))
+            self.assertEqual(view(factory.post("/")), ("default", "default"))
+            pinned = factory.get("/")
+            pinned.COOKIES[PIN_COOKIE] = "1"
+            self.assertEqual(view(pinned), ("default", "default"))
+            self.assertEqual(router.db_for_read(Task), "default")
+
+            response = self.client.post("/", {"title": "Written"})
+            self.assertIn(PIN_COOKIE, response.cookies)
+            self.assertNotIn(PIN_COOKIE, self.client.get("/").cookies)
+
+        self.assertEqual(view(factory.get("/")), ("default", "default"))
+        self.assertNotIn(PIN_COOKIE, self.client.post("/", {"title": "Other"}).cookies)
+
+        with tempfile.TemporaryDirectory() as root:
+            replica = Path(root, "replica.sqlite3")
+            call_command("sync_replica", path=str(replica), stdout=StringIO())
+            with closing(sqlite3.connect(replica)) as copy:
+                titles = [row[0] for row in copy.execute("SELECT title FROM tasks_task ORDER BY id")]
+        self.assertEqual(titles, ["Written", "Other"])
+
+    @tc("TC065")
+    def test_clients_read_their_writes_with_a_lagging_replica(self):
+        """Réplica en retard : le cache de la liste est indexé par base et version, chacun voit ses écritures et la synchro."""
+        Task.objects.create(title="Before sync")
+        with tempfile.TemporaryDirectory() as root:
+            replica = Path(root, "replica.sqlite3")
+            call_command("sync_replica", path=str(replica), stdout=StringIO())
+            # A real second database for this test only.
+            connections.settings["replica"] = {**connections["default"].settings_dict, "NAME": str(replica)}
+            self.addCleanup(connections.settings.pop, "replica")
+            self.addCleanup(setattr, type(self), "databases", type(self).databases)
+            type(self).databases = {*type(self).databases, "replica"}
+            self.addCleanup(connections.__delitem__, "replica")
+            self.addCleanup(connections["replica"].close)
+
+            writer, reader = Client(), Client()
+            with override_settings(TASKS_REPLICA_DATABASE="replica"):
+                self.assertContains(reader.get("/"), "Before sync")
+                writer.post("/", {"title": "Own write"})
+                self.assertNotContains(reader.get("/"), "Own write")
+                self.assertNotContains(reader.get("/", {"search": "own"}), "Own write")
+                self.assertContains(writer.get("/"), "Own write")
+                self.assertContains(writer.get("/", {"search": "own"}), "Own write")
+
+                call_command("sync_replica", path=str(replica), stdout=StringIO())
+                self.assertContains(reader.get("/"), "Own write")
+
+class ArchiveTests(TestCase):
+    @tc("TC055")
+    def test_old_completed_tasks_move_to_archive(self):
+        """archive_tasks déplace par lots les tâches terminées anciennes vers l'archive, consultable sur /archive/."""
+        old = timezone.now() - timedelta(days=40)
+        moved = [Task.objects.create(title=f"Old done {i}", complete=True, priority=i == 0) for i in range(3)]
+        Task.objects.filter(id__in=[task.id for task in moved]).update(updated=old)
+        recent = Task.objects.create(title="Recent done", complete=True)
+        pending = Task.objects.create(title="Old pending")
+        Task.objects.filter(id=pending.id).update(updated=old)
+
+        out = StringIO()
+        call_command("archive_tasks", days=30, batch_size=2, stdout=out)
+        self.assertIn("Archived 3 task(s).", out.getvalue())
+
+        self.assertEqual(set(Task.objects.values_list("id", flat=True)), {recent.id, pending.id})
+        archived = ArchivedTask.objects.get(task_id=moved[0].id)
+        self.assertEqual((archived.title, archived.priority, archived.created), ("Old done 0", True, moved[0].created))
+        self.assertEqual(archived.updated, old)
+        counters = get_counters()
+        self.assertEqual((counters.total, counters.complete, counters.priority), (2, 1, 0))
+        self.assertEqual(search.search("old done", 10), [])
+
+        response = self.client.get("/archive/")
+        self.assertContains(response, "Old done 2")
+        self.assertNotContains(response, "Recent done")
+
+class PurgeDeletedTests(TransactionTestCase):
+    @tc("TC057")
+    def test_purge_removes_old_tombstones_in_batches(self):
+        """purge_deleted supprime par lots les tâches supprimées depuis longtemps puis lance VACUUM."""
+        tasks = Task.objects.bulk_create(Task(title=f"Purged {i}") for i in range(5))
+        bulk.delete([task.id for task in tasks])
+        Task.all_objects.filter(id__in=[task.id for task in tasks[:4]]).update(
+            deleted_at=timezone.now() - timedelta(days=10)
+        )
+        live = Task.objects.create(title="Live")
+
+        out = StringIO()
+        call_command("purge_deleted", days=7, batch_size=3, verbosity=2, stdout=out)
+        self.assertIn("3 task(s) purged...", out.getvalue())
+        self.assertIn("Purged 4 deleted task(s).", out.getvalue())
+        self.assertIn("VACUUM", out.getvalue())
+        self.assertEqual(purge.free_pages(), 0)
+        self.assertEqual(
+            set(Task.all_objects.values_list("id", flat=True)), {tasks[4].id, live.id}
+        )
+        self.assertEqual(search.search("purged", 10), [])
+
+    def set_auto_vacuum(self, mode):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA auto_vacuum = {mode}")
+            cursor.execute("VACUUM")  # applies the new mode
+            cursor.execute("PRAGMA auto_vacuum")
+            self.assertEqual(cursor.fetchone()[0], mode)
+
+    @tc("TC066")
+    def test_purge_returns_every_free_page(self):
+        """purge_deleted rend toutes les pages libérées, avec VACUUM comme avec auto_vacuum INCREMENTAL."""
+        self.addCleanup(self.set_auto_vacuum, purge.AUTO_VACUUM_NONE)
+        for mode, statement in (
+            (purge.AUTO_VACUUM_NONE, "VACUUM"),
+            (purge.AUTO_VACUUM_INCREMENTAL, "PRAGMA incremental_vacuum"),
+        ):
+            with self.subTest(statement=statement):
+                self.set_auto_vacuum(mode)
+                tasks = Task.objects.bulk_create(
+                    Task(title=f"Purged {i} " + "x" * 180) for i in range(2000)
+                )
+                Task.all_objects.filter(id__in=[task.id for task in tasks]).update(
+                    deleted_at=timezone.now() - timedelta(days=10)
+                )
+                before = purge.database_size()
+
+                out = StringIO()
+                call_command("purge_deleted", days=7, stdout=out)
+                self.assertIn(f"{statement}: {before} -> ", out.getvalue())
+                self.assertEqual(purge.free_pages(), 0)
+                self.assertLess(purge.database_size(), before // 2)
@@ -1,10 +1,22 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, views
+
+# Under ASGI the page views are served by their async versions.
+pages = async_views if settings.TASKS_ASYNC_VIEWS else views
 
 urlpatterns = [
-	path('', views.index, name="list"),
-	path('update_task/<str:pk>/', views.updateTask, name="update_task"),
-	path('delete_task/<str:pk>/', views.deleteTask, name="delete")
+	path('', pages.index, name="list"),
+	path('update_task/<str:pk>/', pages.updateTask, name="update_task"),
+	path('delete_task/<str:pk>/', pages.deleteTask, name="delete"),
+	path('events/', pages.taskEvents, name="task_events"),
+	path('archive/', views.archivedTasks, name="archive"),
+	path('toggle_complete/<int:pk>/', views.toggleTask, {'field': 'complete'}, name="toggle_complete"),
+	path('toggle_priority/<int:pk>/', views.toggleTask, {'field': 'priority'}, name="toggle_priority"),
+
+	path('api/tasks/', api.task_collection, name="api_tasks"),
+	path('api/tasks/bulk/', api.task_bulk, name="api_tasks_bulk"),
+	path('api/tasks/<int:pk>/', api.task_detail, name="api_task"),
 	
 ]
\ No newline at end of file
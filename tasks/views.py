@@ -1,26 +1,106 @@
+import hashlib
+
 from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.views.decorators.http import condition, require_POST
 
+from . import bulk, events, search
+from .cache import list_version, task_list_key
+from .counters import get_counters
 from .forms import TaskForm
-from .models import Task
+from .fragments import (
+	invalid_response,
+	removed_response,
+	render_rows,
+	row_response,
+	wants_fragment,
+)
+from .models import ArchivedTask, Task
+from .pagination import paginate
+from .routers import replica_reads
+from .rows import task_rows
+
+
+def _make_etag(request, *parts):
+	# APP_VERSION is part of every tag so a deploy (new templates) never
+	# answers 304 for a page rendered by the previous release. The pages
+	# embed a CSRF token, so the CSRF secret is part of it too: once it is
+	# rotated (login, expired or cleared cookie) a cached form that would
+	# fail with 403 is not reused. get_token() sets the secret the page
+	# will carry when the request has none yet.
+	get_token(request)
+	raw = ':'.join(str(part) for part in (settings.APP_VERSION, request.META['CSRF_COOKIE'], *parts))
+	return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+def _list_etag(request):
+	"""
+	Change marker of the whole task table: the list version, which every
+	write moves, from any process (see ``tasks.cache``).
+
+	No Last-Modified is sent for the list: a deletion leaves Max('updated')
+	untouched, so If-Modified-Since alone would serve a stale page.
+	"""
+	if request.method not in ('GET', 'HEAD'):
+		return None
+	return _make_etag(request, list_version(request), request.GET.urlencode())
+
+def _task_updated(request, pk):
+	if request.method not in ('GET', 'HEAD'):
+		return None
+	return Task.objects.filter(id=pk).values_list('updated', flat=True).first()
+
+def _task_etag(request, pk):
+	updated = _task_updated(request, pk)
+	return _make_etag(request, pk, updated) if updated else None
 
 
 # Create your views here.
+@replica_reads
+@condition(etag_func=_list_etag)
 def index(request):
-	tasks = Task.objects.all().order_by('-priority','id')
-
 	form = TaskForm()
 
 	if request.method == 'POST':
 		form = TaskForm(request.POST)
 		if form.is_valid():
 			#adds to the database if valid
-			form.save()
+			task = form.save()
+			if wants_fragment(request):
+				return row_response(task, status=201)
+		elif wants_fragment(request):
+			return invalid_response(form)
 		return redirect('/')
 
-	context= {'tasks':tasks,'form':form, 'APP_VERSION': settings.APP_VERSION}
+	context= {'form':form, 'APP_VERSION': settings.APP_VERSION}
+
+	after, before = request.GET.get('after'), request.GET.get('before')
+	query = request.GET.get('search', '').strip()
+	context['search'] = query
+	key = task_list_key(after, before, query, request)
+	task_list = cache.get(key)
+	if task_list is None:
+		if query:
+			page = None
+			tasks = search.search(query, settings.TASKS_SEARCH_LIMIT)
+		else:
+			page = paginate(Task.objects.rows(), settings.TASKS_PAGE_SIZE, after=after, before=before)
+			tasks = task_rows(page.tasks)
+		# Rendered without the request: the fragment is shared by every
+		# visitor, so it must not contain per-request data such as CSRF tokens.
+		task_list = render_to_string('tasks/task_list.html', {'rows':render_rows(tasks),'matches':len(tasks),'page':page,'search':query,'counters':get_counters()})
+		cache.set(key, task_list, settings.TASKS_LIST_CACHE_TIMEOUT)
+		context.update({'tasks':tasks,'page':page})
+
+	context['task_list'] = task_list
 	return render(request, 'tasks/list.html',context)
 
+@replica_reads
+@condition(etag_func=_task_etag, last_modified_func=_task_updated)
 def updateTask(request,pk):
 	task = Task.objects.get(id=pk)
 	form = TaskForm(instance=task)
@@ -29,18 +109,71 @@ def updateTask(request,pk):
 		form = TaskForm(request.POST,instance=task)
 		if form.is_valid():
 			form.save()
+			if wants_fragment(request):
+				return row_response(task)
 			return redirect('/')
-
+		if wants_fragment(request):
+			return invalid_response(form)
 
 	context = {'form':form}
 	return render(request, 'tasks/update_task.html',context)
 
+@replica_reads
+@condition(etag_func=_task_etag, last_modified_func=_task_updated)
 def deleteTask(request,pk):
 	item = Task.objects.get(id=pk)
 
 	if request.method == "POST":
-		item.delete()
+		bulk.delete([item.id])
+		if wants_fragment(request):
+			return removed_response(pk)
 		return redirect('/')
 
 	context = {'item':item}
-	return render(request, 'tasks/delete.html', context)
\ No newline at end of file
+	return render(request, 'tasks/delete.html', context)
+
+@require_POST
+def toggleTask(request,pk,field):
+	current = request.POST.get('current')
+	if current not in ('0', '1'):
+		return HttpResponseBadRequest("'current' must be 0 or 1")
+	current = current == '1'
+
+	# One conditional UPDATE, no fetch: the flag only flips if it still has
+	# the value the client saw, so a double click cannot flip it back.
+	flipped = Task.objects.filter(id=pk, **{field: current}).update(
+		**{field: not current, 'updated': timezone.now()}
+	)
+	if flipped:
+		events.tasks_saved([pk])
+		state, status = not current, 200
+	else:
+		state = Task.objects.filter(id=pk).values_list(field, flat=True).first()
+		if state is None:
+			raise Http404('No task matches the given query.')
+		status = 409
+
+	if wants_fragment(request):
+		return row_response(Task.objects.get(id=pk), status=status)
+	if 'application/json' not in request.headers.get('Accept', ''):
+		return redirect('/')
+	return JsonResponse({'id': pk, field: state}, status=status)
+
+@replica_reads
+def archivedTasks(request):
+	# Newest first, one page at a time: ?before=<id> continues after the
+	# last task shown, through the primary key index.
+	tasks = ArchivedTask.objects.order_by('-id')
+	before = request.GET.get('before', '')
+	if before.isdigit():
+		tasks = tasks.filter(id__lt=int(before))
+	tasks = list(tasks[:settings.TASKS_PAGE_SIZE + 1])
+	older = tasks[-2].id if len(tasks) > settings.TASKS_PAGE_SIZE else None
+	context = {'tasks':tasks[:settings.TASKS_PAGE_SIZE], 'older':older}
+	return render(request, 'tasks/archive.html', context)
+
+def taskEvents(request):
+	# Live updates are streamed by tasks.async_views.taskEvents under ASGI.
+	# A WSGI worker would be held for the whole connection, so decline:
+	# 204 tells EventSource not to reconnect, and pages keep plain reloads.
+	return HttpResponse(status=204)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo.settings')
+# Serve the async versions of the task views (see tasks.async_views).
+os.environ.setdefault('TASKS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
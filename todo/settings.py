@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,8 +41,12 @@ INSTALLED_APPS = [
     'tasks'
 ]
 
+# Every middleware must stay async-capable: under ASGI a sync-only one
+# forces each request through a thread (checked by tasks.checks).
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'tasks.middleware.CompressionMiddleware',
+    'tasks.routers.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -77,7 +82,33 @@ WSGI_APPLICATION = 'todo.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # TODO_DB_PATH lets benchmarks and scripts point at a scratch file.
+        'NAME': os.environ.get('TODO_DB_PATH', BASE_DIR / 'db.sqlite3'),
+    }
+}
+
+# Read replica: a copy of the database refreshed by `manage.py sync_replica`
+# (SQLite backup API). Setting TODO_REPLICA_PATH sends the GET reads of the
+# task pages to it (tasks.routers); tests read it through the test database.
+if os.environ.get('TODO_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['TODO_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['tasks.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Cached task lists are keyed by a version the database maintains, so every
+# worker sees writes from any process. The local-memory cache is per process;
+# a shared backend (Redis, Memcached) only lets workers share their entries.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -127,4 +158,61 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TEST_RUNNER = "json_test_runner.JsonTestRunner"
 
-APP_VERSION = "1.7.0"
\ No newline at end of file
+APP_VERSION = "1.7.0"
+
+# Number of tasks shown per page on the home page (keyset pagination).
+TASKS_PAGE_SIZE = 50
+
+# Lifetime (seconds) of a cached task list fragment. Writes invalidate the
+# fragment immediately, so this only bounds memory held by unused pages.
+TASKS_LIST_CACHE_TIMEOUT = 3600
+
+# Rows fetched per database round trip when streaming /api/tasks/.
+TASKS_API_CHUNK_SIZE = 2000
+
+# Upper bound on ids / tasks accepted by one /api/tasks/bulk/ request.
+TASKS_BULK_MAX_ITEMS = 1000
+
+# Serve tasks.async_views instead of tasks.views (set by todo/asgi.py).
+TASKS_ASYNC_VIEWS = os.environ.get('TASKS_ASYNC_VIEWS') == '1'
+
+# Seconds between keepalive comments on the /events/ live update stream.
+TASKS_EVENTS_KEEPALIVE = 15
+# Maximum number of ranked matches returned by a title search (?search=).
+TASKS_SEARCH_LIMIT = 100
+
+# Compile the task templates when the app loads rather than on first use
+# (enabled by todo.settings_production).
+TASKS_WARM_TEMPLATES = False
+
+# Serve collected static files from STATIC_ROOT through tasks.staticfiles
+# (enabled by todo.settings_production; runserver serves them in DEBUG).
+TASKS_SERVE_STATIC = False
+
+# Responses smaller than this (bytes) are sent uncompressed by
+# tasks.middleware.CompressionMiddleware: the saving would not pay for it.
+TASKS_COMPRESS_MIN_SIZE = 860
+
+# PRAGMA name -> value run on every new SQLite connection (tasks.sqlite);
+# todo.settings_production enables WAL and friends.
+TASKS_SQLITE_PRAGMAS = {}
+
+# Database alias that tasks.routers reads from, None without a replica.
+TASKS_REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+
+# After a POST, the client reads from the primary for this many seconds
+# (cookie), which must exceed the sync_replica interval plus its run time.
+TASKS_REPLICA_PIN_SECONDS = 15
+
+# archive_tasks moves completed tasks unchanged for this many days to the
+# archive table, this many per transaction.
+TASKS_ARCHIVE_AFTER_DAYS = 30
+TASKS_ARCHIVE_BATCH_SIZE = 500
+
+# Deleted tasks stay as tombstones (deleted_at), restorable, for this many
+# days; purge_deleted then removes them this many per transaction.
+TASKS_PURGE_AFTER_DAYS = 7
+TASKS_PURGE_BATCH_SIZE = 500
+
+# Tasks inserted per transaction (one bulk_create) by import_dataset.
+TASKS_IMPORT_BATCH_SIZE = 2000
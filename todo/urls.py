@@ -13,10 +13,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from tasks import staticfiles
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('tasks.urls'))
 ]
+
+if settings.TASKS_SERVE_STATIC:
+    # Collected files, precompressed and cached forever (tasks.staticfiles).
+    urlpatterns.append(
+        re_path(r'^%s(?P<path>.+)$' % settings.STATIC_URL.lstrip('/'), staticfiles.serve)
+    )